@@ -0,0 +1,369 @@
+"""
+Blocked Lists: insert and delete in the middle without moving everything
+
+Examples 16 and 17 of PY_List.py use insert() and pop(index). A Python list is
+one array of pointers, so both have to move every element behind the index
+by one slot:
+
+    insert_list.insert(2, 3)         # moves len - 2 pointers to the right
+    remove_index_list.pop(2)         # moves len - 3 pointers to the left
+
+That is O(n): about 3 ms per call in the middle of a list of 10^7 items.
+Millions of such edits take hours.
+
+BlockedList keeps the items in many small lists ("blocks") of about `load`
+items each (1000 by default):
+
+    [[a0 ... a999], [a1000 ... a1999], ..., [... a9999999]]
+
+- An insert or delete only moves the items of one block: at most 2 * load
+  pointers, however long the whole list is.
+- To find the block that holds position i, a Fenwick tree (binary indexed
+  tree) over the block lengths adds up lengths in O(log blocks) steps, and
+  is updated in O(log blocks) when one block grows or shrinks.
+- A block that grows past 2 * load is split in two, and a block below
+  load / 2 is merged with a neighbour. Both rebuild the Fenwick tree (O(blocks)),
+  but that happens at most once every load / 2 edits of a block.
+
+So positional insert and delete cost O(log n + load) instead of O(n).
+BlockedList has the whole list API: indexing, slicing, iteration, append,
+extend, insert, pop, remove, index, count, sort, reverse, +, *, comparisons.
+
+The price: reading one item by index is a Python method call plus the
+Fenwick search, roughly 10-25 times slower than list[i]. Iteration, `in`,
+count() and sort() run over the blocks at C speed. Slice assignment and
+deletion rebuild the blocks in O(n), just as they are O(n) for a list.
+Up to some 10^4 items a plain list is faster for everything (memmove is
+very fast); benchmark() shows where the crossover lies on your machine.
+"""
+
+import random
+import sys
+import time
+from collections.abc import MutableSequence
+from itertools import chain, islice
+
+
+DEFAULT_LOAD = 1000
+
+
+class BlockedList(MutableSequence):
+    def __init__(self, iterable=(), load=DEFAULT_LOAD):
+        if load < 4:
+            raise ValueError("load must be at least 4")
+        self._load = load
+        self._reset(list(iterable))
+
+    # Topic 1: Blocks and the Fenwick tree over their lengths
+    def _reset(self, values):
+        load = self._load
+        self._blocks = [values[i:i + load] for i in range(0, len(values), load)]
+        self._len = len(values)
+        self._fenwick = None   # built on the first positional lookup
+
+    def _build_fenwick(self):
+        tree = [0]
+        tree.extend(map(len, self._blocks))
+        size = len(self._blocks)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._fenwick = tree
+        return tree
+
+    def _grow(self, block_index, delta):
+        """Record that block block_index changed length by delta."""
+        tree = self._fenwick
+        if tree is None:
+            return
+        size = len(tree) - 1
+        i = block_index + 1
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def _locate(self, index):
+        """Return (block number, position in that block) of item index, 0 <= index < len."""
+        if len(self._blocks) == 1:
+            return 0, index
+        last = self._blocks[-1]
+        if index >= self._len - len(last):   # appends and pops at the end are common
+            return len(self._blocks) - 1, index - (self._len - len(last))
+        tree = self._fenwick or self._build_fenwick()
+        size = len(tree) - 1
+        position = 0
+        step = 1 << (size.bit_length() - 1)
+        while step:   # binary descent: largest prefix of blocks whose total is <= index
+            nxt = position + step
+            if nxt <= size and tree[nxt] <= index:
+                position = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return position, index
+
+    def _after_insert(self, block_index):
+        block = self._blocks[block_index]
+        if len(block) > 2 * self._load:
+            half = len(block) // 2
+            self._blocks[block_index:block_index + 1] = [block[:half], block[half:]]
+            self._fenwick = None
+        else:
+            self._grow(block_index, 1)
+
+    def _after_delete(self, block_index):
+        blocks = self._blocks
+        block = blocks[block_index]
+        if len(block) >= self._load // 2 or len(blocks) == 1:
+            self._grow(block_index, -1)
+            return
+        # A small block joins its neighbour; split again if that got too big.
+        neighbour = block_index - 1 if block_index else block_index + 1
+        first = min(block_index, neighbour)
+        merged = blocks[first] + blocks[first + 1]
+        if len(merged) > 2 * self._load:
+            half = len(merged) // 2
+            blocks[first:first + 2] = [merged[:half], merged[half:]]
+        else:
+            blocks[first:first + 2] = [merged]
+        self._fenwick = None
+
+    def _check(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("BlockedList index out of range")
+        return index
+
+    # Topic 2: Positional access and edits
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return type(self)(self._islice(start, stop), load=self._load)
+            return type(self)(list(self)[index], load=self._load)
+        block, offset = self._locate(self._check(index))
+        return self._blocks[block][offset]
+
+    def _islice(self, start, stop):
+        """Iterate over items start..stop-1 without going through the blocks before start."""
+        if start >= stop:
+            return iter(())
+        block, offset = self._locate(start)
+        rest = chain.from_iterable(islice(self._blocks, block + 1, None))
+        items = chain(islice(self._blocks[block], offset, None), rest)
+        return islice(items, stop - start)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            values = list(self)
+            values[index] = value
+            self._reset(values)
+            return
+        block, offset = self._locate(self._check(index))
+        self._blocks[block][offset] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            values = list(self)
+            del values[index]
+            self._reset(values)
+            return
+        block, offset = self._locate(self._check(index))
+        del self._blocks[block][offset]
+        self._len -= 1
+        self._after_delete(block)
+
+    def insert(self, index, value):
+        """Insert value before index; like list.insert, out-of-range indexes are clamped."""
+        if index < 0:
+            index = max(index + self._len, 0)
+        if index >= self._len:
+            self.append(value)
+            return
+        block, offset = self._locate(index)
+        self._blocks[block].insert(offset, value)
+        self._len += 1
+        self._after_insert(block)
+
+    def append(self, value):
+        if not self._blocks:
+            self._blocks.append([])
+            self._fenwick = None
+        self._blocks[-1].append(value)
+        self._len += 1
+        self._after_insert(len(self._blocks) - 1)
+
+    def extend(self, values):
+        values = list(values)   # also handles extending with self
+        if not values:
+            return
+        tail = self._blocks.pop() if self._blocks else []
+        tail.extend(values)
+        load = self._load
+        self._blocks.extend(tail[i:i + load] for i in range(0, len(tail), load))
+        self._len += len(values)
+        self._fenwick = None
+
+    def pop(self, index=-1):
+        if not self._len:
+            raise IndexError("pop from empty BlockedList")
+        block, offset = self._locate(self._check(index))
+        value = self._blocks[block].pop(offset)
+        self._len -= 1
+        self._after_delete(block)
+        return value
+
+    def remove(self, value):
+        del self[self.index(value)]
+
+    def clear(self):
+        self._reset([])
+
+    # Topic 3: Whole-list operations, run block by block
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        return chain.from_iterable(map(reversed, reversed(self._blocks)))
+
+    def __contains__(self, value):
+        return any(value in block for block in self._blocks)
+
+    def index(self, value, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(self._len)
+        offset = 0
+        for block in self._blocks:
+            end = offset + len(block)
+            if end > start and offset < stop:
+                try:
+                    return offset + block.index(value, max(start - offset, 0), stop - offset)
+                except ValueError:
+                    pass
+            offset = end
+        raise ValueError(f"{value!r} is not in BlockedList")
+
+    def count(self, value):
+        return sum(block.count(value) for block in self._blocks)
+
+    def reverse(self):
+        self._blocks.reverse()
+        for block in self._blocks:
+            block.reverse()
+        self._fenwick = None
+
+    def sort(self, *, key=None, reverse=False):
+        values = list(self)
+        values.sort(key=key, reverse=reverse)
+        self._reset(values)
+
+    def copy(self):
+        return type(self)(self, load=self._load)
+
+    def __add__(self, other):
+        return type(self)(chain(self, other), load=self._load)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __mul__(self, times):
+        return type(self)(list(self) * times, load=self._load)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, times):
+        self._reset(list(self) * times)
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, (BlockedList, list)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __lt__(self, other):
+        return list(self) < list(other)
+
+    def __le__(self, other):
+        return list(self) <= list(other)
+
+    def __gt__(self, other):
+        return list(self) > list(other)
+
+    def __ge__(self, other):
+        return list(self) >= list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"BlockedList({list(self)!r})"
+
+
+def benchmark(sizes=(10**2, 10**3, 10**4, 3 * 10**4, 10**5, 10**6, 10**7), edits=2000):
+    """Random middle inserts and pops on list and BlockedList; find where BlockedList starts to win."""
+    def edit(sequence, positions):
+        start = time.perf_counter()
+        for position in positions:
+            sequence.insert(position, -1)
+            sequence.pop(position)
+        return (time.perf_counter() - start) / (2 * len(positions))
+
+    def read(sequence, positions):
+        start = time.perf_counter()
+        for position in positions:
+            sequence[position]
+        return (time.perf_counter() - start) / len(positions)
+
+    rng = random.Random(1)
+    print(f"{'n':>10} {'list edit':>10} {'blocked edit':>13} {'list read':>10} {'blocked read':>13}")
+    crossover = None
+    for n in sizes:
+        values = list(range(n))
+        blocked = BlockedList(values)
+        count = edits if n <= 10**5 else edits // 10   # list edits on 10^7 take milliseconds each
+        positions = [rng.randrange(n) for _ in range(count)]
+        list_edit, blocked_edit = edit(values, positions), edit(blocked, positions)
+        list_read, blocked_read = read(values, positions), read(blocked, positions)
+        assert blocked == values
+        print(f"{n:>10} {list_edit * 1e6:>8.2f}us {blocked_edit * 1e6:>11.2f}us "
+              f"{list_read * 1e6:>8.2f}us {blocked_read * 1e6:>11.2f}us")
+        if crossover is None and blocked_edit < list_edit:
+            crossover = n
+        del values, blocked
+    if crossover is None:
+        print("the built-in list was faster at every size")
+    else:
+        print(f"BlockedList edits are faster from about n = {crossover} on")
+
+
+if __name__ == "__main__":
+    # Example 1: Examples 16 and 17 of PY_List.py with a BlockedList
+    insert_list = BlockedList([1, 2, 4, 5])
+    insert_list.insert(2, 3)
+    print(insert_list)                       # Output: BlockedList([1, 2, 3, 4, 5])
+    print(insert_list.pop(2), insert_list)   # Output: 3 BlockedList([1, 2, 4, 5])
+
+    # Example 2: a long list is stored as blocks of about `load` items
+    numbers = BlockedList(range(100), load=16)
+    print([len(block) for block in numbers._blocks])   # Output: [16, 16, 16, 16, 16, 16, 4]
+    for _ in range(20):
+        numbers.insert(20, "x")              # the block holding index 20 grows and is split
+    print([len(block) for block in numbers._blocks])   # Output: [16, 19, 17, 16, 16, 16, 16, 4]
+
+    # Example 3: the rest of the list API
+    print(numbers[18:23], numbers[-1], numbers.index(21), numbers.count("x"))
+    # Output: BlockedList([18, 19, 'x', 'x', 'x']) 99 41 20
+    del numbers[20:40]
+    print(numbers == list(range(100)), 50 in numbers, isinstance(numbers, MutableSequence))
+    # Output: True True True
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - list.insert() and list.pop(i) move every element behind i: O(n).
+# - Small blocks limit that movement to one block; a Fenwick tree finds the block in O(log n).
+# - The blocks cost some speed on single reads, so use them when edits in the middle dominate.
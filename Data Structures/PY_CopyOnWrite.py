@@ -0,0 +1,333 @@
+"""
+Copy-on-Write Lists and Dicts: snapshots that cost nothing until someone writes
+
+Example 32 of PY_List.py shows the two ways of handing a list to someone else:
+
+    direct_reference_list = original_list          # shared: their changes are ours
+    shallow_copied_list = original_list.copy()     # safe, but copies every element
+
+Code that passes lists around usually makes the defensive copy, "just in case".
+For a list of a million items that is 8 MB and a few milliseconds per reader,
+even if no reader ever changes anything.
+
+CowList and CowDict give each reader its own handle but share one underlying
+list/dict between all handles:
+
+    data = CowList(range(10**6))
+    snapshot = data.copy()      # O(1): a new handle, no elements copied
+    snapshot[0] = -1            # first write through this handle: copy now, then write
+    data[0]                     # 0 - the other handles never see the change
+
+- Reading (len, [], iteration, in, ==, index, count, ...) goes straight to the
+  shared storage.
+- copy() only counts one more handle on the storage.
+- A write through a handle whose storage is shared first gives that handle a
+  private copy (one list.copy()/dict.copy(), like the defensive copy, but only
+  for the handles that really write). Later writes through it are in place.
+- When a handle is garbage collected the count goes down again, so the last
+  remaining handle writes without copying.
+
+Like list.copy(), the copies are shallow: the elements themselves are shared.
+A nested list inside a CowList is one object for every handle.
+
+Threads: the copy decision is made under a lock, so two threads writing through
+different handles of the same storage are safe. One handle used from several
+threads at once needs a lock, just like a plain list.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import MutableMapping, MutableSequence
+
+
+_lock = threading.Lock()
+
+
+# Topic 1: Shared storage with a handle count
+class _Store:
+    __slots__ = ("data", "handles")
+
+    def __init__(self, data):
+        self.data = data
+        self.handles = 1
+
+
+class _CopyOnWrite:
+    __slots__ = ("_store",)
+    _empty = None   # the storage type: list or dict
+
+    def __init__(self, iterable=()):
+        self._store = _Store(self._empty(iterable))
+
+    def __del__(self):
+        store = getattr(self, "_store", None)
+        if store is not None:
+            with _lock:
+                store.handles -= 1
+
+    def _share(self):
+        new = object.__new__(type(self))
+        with _lock:
+            self._store.handles += 1
+        new._store = self._store
+        return new
+
+    def _writable(self):
+        """Return storage this handle may change, copying it first if other handles share it."""
+        store = self._store
+        if store.handles > 1:
+            with _lock:
+                if store.handles > 1:   # another handle may have copied away meanwhile
+                    # Copy before giving up our share: until the count drops, no other
+                    # handle believes it is alone and starts writing in place.
+                    private = _Store(store.data.copy())
+                    store.handles -= 1
+                    store = self._store = private
+        return store.data
+
+    def copy(self):
+        """Return a snapshot handle in O(1); the storage is copied only when one side writes."""
+        return self._share()
+
+    __copy__ = copy
+
+    @property
+    def shared(self):
+        """True while another handle uses the same storage."""
+        return self._store.handles > 1
+
+    def __reduce__(self):
+        return type(self), (self._store.data,)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._store.data!r})"
+
+    def __len__(self):
+        return len(self._store.data)
+
+    def __iter__(self):
+        return iter(self._store.data)
+
+    def __contains__(self, value):
+        return value in self._store.data
+
+    def __eq__(self, other):
+        if isinstance(other, _CopyOnWrite):
+            other = other._store.data
+        return self._store.data == other
+
+    __hash__ = None
+
+
+# Topic 2: CowList
+class CowList(_CopyOnWrite, MutableSequence):
+    __slots__ = ()
+    _empty = list
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CowList(self._store.data[index])
+        return self._store.data[index]
+
+    def __reversed__(self):
+        return reversed(self._store.data)
+
+    def index(self, value, *args):
+        return self._store.data.index(value, *args)
+
+    def count(self, value):
+        return self._store.data.count(value)
+
+    def __lt__(self, other):
+        return self._store.data < (other._store.data if isinstance(other, CowList) else other)
+
+    def __le__(self, other):
+        return self._store.data <= (other._store.data if isinstance(other, CowList) else other)
+
+    def __gt__(self, other):
+        return self._store.data > (other._store.data if isinstance(other, CowList) else other)
+
+    def __ge__(self, other):
+        return self._store.data >= (other._store.data if isinstance(other, CowList) else other)
+
+    def __add__(self, other):
+        other = other._store.data if isinstance(other, CowList) else other
+        return CowList(self._store.data + other)
+
+    def __radd__(self, other):
+        return CowList(list(other) + self._store.data)
+
+    def __mul__(self, times):
+        return CowList(self._store.data * times)
+
+    __rmul__ = __mul__
+
+    # Everything below writes, so it goes through _writable().
+    def __setitem__(self, index, value):
+        self._writable()[index] = value
+
+    def __delitem__(self, index):
+        del self._writable()[index]
+
+    def insert(self, index, value):
+        self._writable().insert(index, value)
+
+    def append(self, value):
+        self._writable().append(value)
+
+    def extend(self, values):
+        if values is self:
+            values = list(self._store.data)
+        self._writable().extend(values)
+
+    def pop(self, index=-1):
+        return self._writable().pop(index)
+
+    def remove(self, value):
+        self._writable().remove(value)
+
+    def clear(self):
+        self._writable().clear()
+
+    def reverse(self):
+        self._writable().reverse()
+
+    def sort(self, *, key=None, reverse=False):
+        self._writable().sort(key=key, reverse=reverse)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, times):
+        data = self._writable()
+        data *= times
+        return self
+
+
+# Topic 3: CowDict
+class CowDict(_CopyOnWrite, MutableMapping):
+    __slots__ = ()
+    _empty = dict
+
+    def __init__(self, iterable=(), **kwargs):
+        self._store = _Store(dict(iterable, **kwargs))
+
+    def __getitem__(self, key):
+        return self._store.data[key]
+
+    def get(self, key, default=None):
+        return self._store.data.get(key, default)
+
+    def __or__(self, other):
+        other = other._store.data if isinstance(other, CowDict) else other
+        return CowDict(self._store.data | other)
+
+    def __ror__(self, other):
+        return CowDict(dict(other) | self._store.data)
+
+    def __setitem__(self, key, value):
+        self._writable()[key] = value
+
+    def __delitem__(self, key):
+        del self._writable()[key]
+
+    def pop(self, key, *default):
+        return self._writable().pop(key, *default)
+
+    def popitem(self):
+        return self._writable().popitem()
+
+    def setdefault(self, key, default=None):
+        data = self._store.data
+        if key in data:
+            return data[key]
+        return self._writable().setdefault(key, default)
+
+    def update(self, other=(), **kwargs):
+        if isinstance(other, CowDict):
+            other = other._store.data
+        self._writable().update(other, **kwargs)
+
+    def clear(self):
+        self._writable().clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+def benchmark(n=10**6, readers=100, writers=5):
+    """Hand a snapshot of one large list to many readers: list.copy() against CowList.copy()."""
+    def handout(make_snapshot):
+        tracemalloc.start()
+        start = time.perf_counter()
+        snapshots = [make_snapshot() for _ in range(readers)]
+        handed_out = time.perf_counter() - start
+        totals = {sum(snapshot) for snapshot in snapshots}   # every reader reads everything
+        for snapshot in snapshots[:writers]:                 # a few readers also write
+            snapshot.append(-1)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert totals == {n * (n - 1) // 2}
+        return handed_out, time.perf_counter() - start, peak
+
+    plain = list(range(n))
+    cow = CowList(plain)
+    print(f"{readers} readers of a list of {n} ints, {writers} of them append once")
+    print(f"{'snapshot':<14} {'hand-out ms':>11} {'total ms':>9} {'peak MB':>8}")
+    for label, make_snapshot in (("list.copy()", plain.copy), ("CowList.copy()", cow.copy)):
+        handed_out, total, peak = handout(make_snapshot)
+        print(f"{label:<14} {handed_out * 1e3:>11.1f} {total * 1e3:>9.1f} {peak / 2**20:>8.1f}")
+
+    index_plain = min(_time(lambda: plain[n // 2]) for _ in range(5))
+    index_cow = min(_time(lambda: cow[n // 2]) for _ in range(5))
+    print(f"one element by index: list {index_plain * 1e9:.0f} ns, CowList {index_cow * 1e9:.0f} ns "
+          f"(a Python method call; iterate or sum() for bulk reads)")
+
+
+def _time(func, number=10**5):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+if __name__ == "__main__":
+    # Example 1: Example 32 of PY_List.py with a copy-on-write list
+    original_list = CowList([1, 2, 3])
+    snapshot = original_list.copy()             # no elements copied
+    print(snapshot.shared)                      # Output: True
+    snapshot[0] = 100                           # the first write copies, then writes
+    print(original_list, snapshot)              # Output: CowList([1, 2, 3]) CowList([100, 2, 3])
+    print(snapshot.shared)                      # Output: False
+
+    # Example 2: readers that only read never copy
+    config = CowDict(host="localhost", port=8080)
+    views = [config.copy() for _ in range(3)]
+    print(all(view._store is config._store for view in views))   # Output: True
+    views[0]["port"] = 9090
+    print(config["port"], views[0]["port"], views[1]["port"])    # Output: 8080 9090 8080
+
+    # Example 3: once the other handles are gone, writes are in place again
+    del views, snapshot
+    print(config.shared, original_list.shared)                   # Output: False False
+
+    # Example 4: they behave like list and dict
+    numbers = CowList([3, 1, 2])
+    numbers.sort()
+    numbers += [4]
+    print(numbers == [1, 2, 3, 4], isinstance(numbers, MutableSequence))   # Output: True True
+    print([0] + numbers)                                                   # Output: CowList([0, 1, 2, 3, 4])
+    print(dict(config | {"debug": True}))
+    # Output: {'host': 'localhost', 'port': 8080, 'debug': True}
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - A snapshot only needs its own copy once somebody writes to it.
+# - Counting the handles on shared storage tells a write whether it must copy first.
+# - Readers of one large list then cost a few bytes each instead of a full copy.
@@ -187,6 +187,8 @@ removed_element = remove_index_list.pop(2)  # Remove element at index 2
 print(removed_element)  # Output: 3
 print(remove_index_list)  # Output: [1, 2, 4, 5]
 # The pop() method removes and returns the element at the specified index.
+# insert() and pop(index) move every element behind the index (O(n)); for long lists edited in
+# the middle see PY_BlockedList.py.
 
 
 #Example 18: Finding the Minimum and Maximum
@@ -376,3 +378,6 @@ print("Direct Reference List:", direct_reference_list)  # Output: [1, 200, 3]
 
 # shallow_copied_list = original_list.copy()  Shallow copy
 # A new list is created in memory, and changes to this new list do not affect the original list.
+
+# PY_CopyOnWrite.py: CowList.copy() gives the safety of a shallow copy in O(1); the elements
+# are only copied when one of the handles is changed.
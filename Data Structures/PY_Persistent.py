@@ -0,0 +1,524 @@
+"""
+Persistent Vectors and Maps: immutable, but cheap to "change"
+
+PY_Tuples.py shows that a tuple cannot be changed. To get an updated version
+you build a new tuple, and that copies every element:
+
+    updated = my_tuple[:i] + (new_value,) + my_tuple[i + 1:]    # O(n)
+    longer = my_tuple + (new_value,)                            # O(n)
+
+For a million elements that is 8 MB and a few milliseconds per change. The
+same holds for a dict that must not be changed in place: d.copy() first.
+
+Persistent containers are immutable too, but an update returns a new version
+that shares almost everything with the old one. Both versions stay valid.
+
+PVector - a 32-way trie (the vector of Clojure and Scala):
+    The elements sit in leaves of 32. Inner nodes have up to 32 children, so
+    10^6 elements need only 4 levels (32**4 > 10^6). v.set(i, x) copies just
+    the nodes on the path from the root to i: 4 small lists instead of 10^6
+    elements. The last, unfinished leaf (the "tail") is kept outside the
+    tree, so append() usually copies only that leaf.
+
+PMap - a hash array mapped trie (HAMT):
+    Every level uses 5 bits of hash(key) to choose one of 32 slots. A node
+    stores only the slots that are used, plus a 32-bit bitmap saying which
+    ones; the position of a slot is the number of set bits below it. m.set()
+    again copies only the path of small nodes down to the key. Keys with the
+    same hash end up together in a collision node.
+
+Both are O(log32 n) per update and lookup: 4 to 5 steps for a million
+elements. Lookups are Python code and so slower than tuple[i] or dict[key];
+the win is in the updates, and in keeping many versions alive.
+
+    v = PVector(range(10**6))
+    v2 = v.set(10, -1)          # v is unchanged; v and v2 share all but ~5 nodes
+    m = PMap(a=1)
+    m2 = m.set("b", 2)          # m is still {'a': 1}
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Mapping, Sequence
+
+
+BITS = 5
+WIDTH = 1 << BITS   # 32 children per node
+MASK = WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+# Topic 1: PVector, a 32-way trie
+# Nodes are plain lists. They are never changed after a version is built; an
+# update copies the nodes it touches and reuses the rest.
+def _new_path(level, node):
+    while level:
+        node = [node]
+        level -= BITS
+    return node
+
+
+def _push_tail(count, level, parent, tail):
+    """Return a copy of parent with the full tail added as the next leaf."""
+    sub = ((count - 1) >> level) & MASK
+    ret = parent[:]
+    if level == BITS:
+        node = tail
+    elif sub < len(parent):
+        node = _push_tail(count, level - BITS, parent[sub], tail)
+    else:
+        node = _new_path(level - BITS, tail)
+    if sub < len(ret):
+        ret[sub] = node
+    else:
+        ret.append(node)
+    return ret
+
+
+def _assoc(level, node, index, value):
+    ret = node[:]
+    if level == 0:
+        ret[index & MASK] = value
+    else:
+        sub = (index >> level) & MASK
+        ret[sub] = _assoc(level - BITS, node[sub], index, value)
+    return ret
+
+
+def _pop_tail(count, level, node):
+    """Return a copy of node without its last leaf, or None if nothing is left."""
+    sub = ((count - 2) >> level) & MASK
+    if level > BITS:
+        child = _pop_tail(count, level - BITS, node[sub])
+        if child is None and sub == 0:
+            return None
+        return node[:sub] + ([child] if child is not None else [])
+    return node[:sub] if sub else None
+
+
+class PVector(Sequence):
+    __slots__ = ("_count", "_shift", "_root", "_tail", "_hash")
+
+    def __init__(self, iterable=()):
+        items = list(iterable)
+        count = len(items)
+        tailoff = ((count - 1) >> BITS) << BITS if count else 0
+        level = [items[i:i + WIDTH] for i in range(0, tailoff, WIDTH)]
+        shift = BITS
+        while len(level) > WIDTH:   # build the tree bottom-up, one level of 32 at a time
+            level = [level[i:i + WIDTH] for i in range(0, len(level), WIDTH)]
+            shift += BITS
+        self._count, self._shift, self._root, self._tail = count, shift, level, items[tailoff:]
+        self._hash = None
+
+    @classmethod
+    def _make(cls, count, shift, root, tail):
+        new = object.__new__(cls)
+        new._count, new._shift, new._root, new._tail, new._hash = count, shift, root, tail, None
+        return new
+
+    def _tailoff(self):
+        return ((self._count - 1) >> BITS) << BITS if self._count else 0
+
+    def _leaf(self, index):
+        if index >= self._tailoff():
+            return self._tail
+        node = self._root
+        for level in range(self._shift, 0, -BITS):
+            node = node[(index >> level) & MASK]
+        return node
+
+    def _check(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        return index
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PVector(list(self)[index])
+        index = self._check(index)
+        return self._leaf(index)[index & MASK]
+
+    def __iter__(self):
+        for start in range(0, self._tailoff(), WIDTH):
+            yield from self._leaf(start)
+        yield from self._tail
+
+    def append(self, value):
+        """Return a new vector with value added at the end."""
+        count, shift, root, tail = self._count, self._shift, self._root, self._tail
+        if len(tail) < WIDTH:
+            return self._make(count + 1, shift, root, tail + [value])
+        if (count >> BITS) > (1 << shift):   # the tree is full: grow a new root
+            root, shift = [root, _new_path(shift, tail)], shift + BITS
+        else:
+            root = _push_tail(count, shift, root, tail)
+        return self._make(count + 1, shift, root, [value])
+
+    def set(self, index, value):
+        """Return a new vector with the element at index replaced (index == len appends)."""
+        if index == self._count:
+            return self.append(value)
+        index = self._check(index)
+        if index >= self._tailoff():
+            tail = self._tail[:]
+            tail[index & MASK] = value
+            return self._make(self._count, self._shift, self._root, tail)
+        return self._make(self._count, self._shift, _assoc(self._shift, self._root, index, value), self._tail)
+
+    def drop_last(self):
+        """Return a new vector without the last element."""
+        count, shift = self._count, self._shift
+        if count == 0:
+            raise IndexError("drop_last from empty PVector")
+        if count == 1:
+            return PVector()
+        if count - self._tailoff() > 1:
+            return self._make(count - 1, shift, self._root, self._tail[:-1])
+        tail = self._leaf(count - 2)   # the last leaf of the tree becomes the tail
+        root = _pop_tail(count, shift, self._root) or []
+        if shift > BITS and len(root) == 1:
+            root, shift = root[0], shift - BITS
+        return self._make(count - 1, shift, root, tail)
+
+    def extend(self, iterable):
+        vector = self
+        for value in iterable:
+            vector = vector.append(value)
+        return vector
+
+    def __add__(self, other):
+        return self.extend(other)
+
+    def __eq__(self, other):
+        if not isinstance(other, PVector):
+            return NotImplemented
+        return self._count == other._count and all(a == b for a, b in zip(self, other))
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(self))
+        return self._hash
+
+    def __repr__(self):
+        return f"PVector({list(self)!r})"
+
+
+# Topic 2: PMap, a hash array mapped trie
+# A node's array holds (key, value) tuples and child nodes, only for the used slots.
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+class _Bitmap:
+    __slots__ = ("bitmap", "array")
+
+    def __init__(self, bitmap, array):
+        self.bitmap = bitmap
+        self.array = array
+
+    def assoc(self, shift, h, key, value):
+        """Return (new node, True if the key is new)."""
+        bit = 1 << ((h >> shift) & MASK)
+        array = self.array
+        index = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            return _Bitmap(self.bitmap | bit, array[:index] + ((key, value),) + array[index:]), True
+        item = array[index]
+        if type(item) is tuple:
+            if item[0] is key or item[0] == key:
+                if item[1] is value:
+                    return self, False
+                new, added = (key, value), False
+            else:
+                new, added = _merge(shift + BITS, item, _hash(item[0]), (key, value), h), True
+        else:
+            new, added = item.assoc(shift + BITS, h, key, value)
+            if new is item:
+                return self, False
+        return _Bitmap(self.bitmap, array[:index] + (new,) + array[index + 1:]), added
+
+    def without(self, shift, h, key):
+        """Return self if key is absent, None if nothing is left, a lone entry, or a new node."""
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return self
+        array = self.array
+        index = (self.bitmap & (bit - 1)).bit_count()
+        item = array[index]
+        if type(item) is tuple:
+            if not (item[0] is key or item[0] == key):
+                return self
+            new = None
+        else:
+            new = item.without(shift + BITS, h, key)
+            if new is item:
+                return self
+        if new is None:
+            array = array[:index] + array[index + 1:]
+            if len(array) == 1 and type(array[0]) is tuple:
+                return array[0]   # the parent can hold the last entry itself
+            return _Bitmap(self.bitmap & ~bit, array) if array else None
+        if len(array) == 1 and type(new) is tuple:
+            return new
+        return _Bitmap(self.bitmap, array[:index] + (new,) + array[index + 1:])
+
+
+class _Collision:
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, h, entries):
+        self.hash = h
+        self.entries = entries
+
+    def find(self, key, default):
+        for k, v in self.entries:
+            if k is key or k == key:
+                return v
+        return default
+
+    def assoc(self, shift, h, key, value):
+        if h != self.hash:   # a different hash: put this node one level down
+            return _Bitmap(1 << ((self.hash >> shift) & MASK), (self,)).assoc(shift, h, key, value)
+        entries = self.entries
+        for index, (k, v) in enumerate(entries):
+            if k is key or k == key:
+                if v is value:
+                    return self, False
+                return _Collision(h, entries[:index] + ((key, value),) + entries[index + 1:]), False
+        return _Collision(h, entries + ((key, value),)), True
+
+    def without(self, shift, h, key):
+        if h != self.hash:
+            return self
+        rest = tuple(entry for entry in self.entries if not (entry[0] is key or entry[0] == key))
+        if len(rest) == len(self.entries):
+            return self
+        return rest[0] if len(rest) == 1 else _Collision(h, rest)
+
+
+def _merge(shift, entry1, h1, entry2, h2):
+    """Return a node holding two entries whose keys differ."""
+    if h1 == h2:
+        return _Collision(h1, (entry1, entry2))
+    i1, i2 = (h1 >> shift) & MASK, (h2 >> shift) & MASK
+    if i1 == i2:
+        return _Bitmap(1 << i1, (_merge(shift + BITS, entry1, h1, entry2, h2),))
+    return _Bitmap((1 << i1) | (1 << i2), (entry1, entry2) if i1 < i2 else (entry2, entry1))
+
+
+def _build(entries, shift):
+    """Build a node from [(hash, key, value)] with distinct keys, splitting by 5 hash bits per level."""
+    if len(entries) == 1:
+        return entries[0][1:]
+    if shift >= 64:   # every bit used and still together: equal hashes
+        return _Collision(entries[0][0], tuple(entry[1:] for entry in entries))
+    buckets = {}
+    for entry in entries:
+        buckets.setdefault((entry[0] >> shift) & MASK, []).append(entry)
+    bitmap, array = 0, []
+    for slot in sorted(buckets):
+        bitmap |= 1 << slot
+        array.append(_build(buckets[slot], shift + BITS))
+    return _Bitmap(bitmap, tuple(array))
+
+
+def _as_root(item):
+    if item is None:
+        return _Bitmap(0, ())
+    if type(item) is tuple:
+        return _Bitmap(1 << (_hash(item[0]) & MASK), (item,))
+    return item
+
+
+def _entries(node):
+    if type(node) is _Collision:
+        yield from node.entries
+        return
+    for item in node.array:
+        if type(item) is tuple:
+            yield item
+        else:
+            yield from _entries(item)
+
+
+class PMap(Mapping):
+    __slots__ = ("_root", "_count", "_hash")
+
+    def __init__(self, mapping=(), **kwargs):
+        items = dict(mapping, **kwargs)
+        entries = [(_hash(key), key, value) for key, value in items.items()]
+        self._root = _as_root(_build(entries, 0) if entries else None)
+        self._count = len(entries)
+        self._hash = None
+
+    @classmethod
+    def _make(cls, root, count):
+        new = object.__new__(cls)
+        new._root, new._count, new._hash = root, count, None
+        return new
+
+    def get(self, key, default=None):
+        h = _hash(key)
+        node, shift = self._root, 0
+        while True:
+            if type(node) is _Collision:
+                return node.find(key, default) if node.hash == h else default
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            item = node.array[(node.bitmap & (bit - 1)).bit_count()]
+            if type(item) is tuple:
+                return item[1] if item[0] is key or item[0] == key else default
+            node, shift = item, shift + BITS
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for key, _ in _entries(self._root):
+            yield key
+
+    def set(self, key, value):
+        """Return a new map with key set to value."""
+        root, added = self._root.assoc(0, _hash(key), key, value)
+        return self if root is self._root else self._make(root, self._count + added)
+
+    def delete(self, key):
+        """Return a new map without key; KeyError if it is missing."""
+        root = self._root.without(0, _hash(key), key)
+        if root is self._root:
+            raise KeyError(key)
+        return self._make(_as_root(root), self._count - 1)
+
+    def update(self, mapping=(), **kwargs):
+        result = self
+        for key, value in dict(mapping, **kwargs).items():
+            result = result.set(key, value)
+        return result
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(_entries(self._root)))
+        return self._hash
+
+    def __repr__(self):
+        return f"PMap({dict(_entries(self._root))!r})"
+
+
+def benchmark(n=10**6, updates=100, versions=20):
+    def per_call(func, number):
+        start = time.perf_counter()
+        for i in range(number):
+            func(i)
+        return (time.perf_counter() - start) / number
+
+    def keep_versions(first, update):
+        tracemalloc.start()
+        kept = [first]
+        for i in range(versions):
+            kept.append(update(kept[-1], i))
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size
+
+    rng = random.Random(1)
+    positions = [rng.randrange(n) for _ in range(updates)]
+    start = time.perf_counter()
+    tup = tuple(range(n))
+    tuple_build = time.perf_counter() - start
+    start = time.perf_counter()
+    vec = PVector(range(n))
+    vector_build = time.perf_counter() - start
+    start = time.perf_counter()
+    dic = {f"key{i}": i for i in range(n)}
+    dict_build = time.perf_counter() - start
+    start = time.perf_counter()
+    pmap = PMap(dic)
+    pmap_build = time.perf_counter() - start
+    keys = list(dic)
+    assert all(pmap[key] == dic[key] for key in keys[::1000])
+
+    rows = [
+        ("build", "tuple(range(n))", tuple_build, "PVector(range(n))", vector_build),
+        ("set one element", "t[:i] + (x,) + t[i+1:]",
+         per_call(lambda i: tup[:positions[i]] + (-1,) + tup[positions[i] + 1:], updates),
+         "v.set(i, x)", per_call(lambda i: vec.set(positions[i], -1), updates)),
+        ("append", "t + (x,)", per_call(lambda i: tup + (i,), updates),
+         "v.append(x)", per_call(lambda i: vec.append(i), updates)),
+        ("read one element", "t[i]", per_call(lambda i: tup[i], n // 10),
+         "v[i]", per_call(lambda i: vec[i], n // 10)),
+        ("build", "dict comprehension", dict_build, "PMap(dict)", pmap_build),
+        ("set one key", "d.copy(); d[k] = x",
+         per_call(lambda i: dic.copy().__setitem__(keys[positions[i]], -1), updates),
+         "m.set(k, x)", per_call(lambda i: pmap.set(keys[positions[i]], -1), updates)),
+        ("read one key", "d[k]", per_call(lambda i: dic[keys[i]], n // 10),
+         "m[k]", per_call(lambda i: pmap[keys[i]], n // 10)),
+    ]
+    print(f"n={n}; times per operation (build: total)")
+    print(f"{'operation':<17} {'copying':<24} {'time':>10}   {'persistent':<18} {'time':>10} {'speed-up':>9}")
+    for operation, copy_label, copy_time, persistent_label, persistent_time in rows:
+        print(f"{operation:<17} {copy_label:<24} {_fmt(copy_time):>10}   {persistent_label:<18} "
+              f"{_fmt(persistent_time):>10} {copy_time / persistent_time:>8.2f}x")
+
+    print(f"memory of {versions} more versions, one element changed in each:")
+    sizes = [
+        ("tuple", keep_versions(tup, lambda t, i: t[:positions[i]] + (-1,) + t[positions[i] + 1:])),
+        ("PVector", keep_versions(vec, lambda v, i: v.set(positions[i], -1))),
+        ("dict", keep_versions(dic, lambda d, i: {**d, keys[positions[i]]: -1})),
+        ("PMap", keep_versions(pmap, lambda m, i: m.set(keys[positions[i]], -1))),
+    ]
+    for label, size in sizes:
+        print(f"  {label:<8} {size / 2**20:>9.2f} MB")
+
+
+def _fmt(seconds):
+    return f"{seconds * 1e3:.1f} ms" if seconds >= 1e-3 else f"{seconds * 1e6:.2f} us"
+
+
+if __name__ == "__main__":
+    # Example 1: "changing" a tuple copies it; a PVector shares the unchanged parts
+    numbers = PVector(range(100))
+    changed = numbers.set(40, -1)
+    print(numbers[40], changed[40], len(changed))           # Output: 40 -1 100
+    print(changed._root[0] is numbers._root[0])             # Output: True (leaf 0..31 is shared)
+
+    # Example 2: append and drop_last return new versions, the old ones stay valid
+    longer = numbers.append(100).append(101)
+    print(longer[-1], len(longer), len(numbers))            # Output: 101 102 100
+    print(list(longer.drop_last().drop_last()) == list(numbers))   # Output: True
+
+    # Example 3: a persistent map
+    config = PMap(host="localhost", port=8080)
+    debug_config = config.set("debug", True)
+    print(dict(config))          # Output: {'host': 'localhost', 'port': 8080}  (order may differ)
+    print(debug_config["debug"], "debug" in config)         # Output: True False
+    print(len(debug_config.delete("port")))                 # Output: 2
+
+    # Example 4: immutable, so hashable and usable as dict keys
+    print({PVector([1, 2]): "vector", PMap(a=1): "map"}[PMap(a=1)])   # Output: map
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - An immutable value can still be updated cheaply if the new version shares structure with the old.
+# - Nodes of 32 keep the trees shallow: 4 to 5 levels for a million elements.
+# - Updates copy a path of small nodes (O(log32 n)) instead of the whole container (O(n)).
@@ -270,4 +270,6 @@ print(sliced_with_obj)  # Output: (2, 3, 4)
 
 #Example 32: Tuple with comprehensions (using generator expressions)
 squared_tuple = tuple(x**2 for x in range(5)) # Creating a tuple of squares using a generator expression
-print(squared_tuple)  # Output: (0, 1, 4, 9, 16)
\ No newline at end of file
+print(squared_tuple)  # Output: (0, 1, 4, 9, 16)
+# PY_Persistent.py: PVector and PMap are immutable like tuples, but an "updated" version
+# shares all unchanged parts with the old one instead of copying every element.
@@ -0,0 +1,165 @@
+"""
+amap(): map() for async functions
+
+map() calls a normal function. If the function is a coroutine function
+(`async def`), map() only creates coroutine objects and never runs them:
+
+    async def fetch(x): ...
+    list(map(fetch, urls))   # [<coroutine object fetch ...>, ...]  nothing happened!
+
+Awaiting them one by one works, but then each call waits for the previous one
+to finish. For I/O-bound work (network, disk) most of that time is spent
+waiting, so it is much faster to keep several calls "in flight" at once.
+
+    async for result in amap(fetch, urls, limit=10):
+        ...
+
+- limit    -> at most this many calls run at the same time (a bounded window,
+              so we never start 1,000,000 tasks at once and the input is
+              read lazily)
+- ordered  -> True: results come out in input order, like map().
+              False: results come out as soon as each call finishes.
+- iterable -> a normal or an async iterable
+
+Cancellation: if the consumer stops early (break, aclose()) or the task
+running the `async for` is cancelled, every call still in flight is cancelled
+and awaited before amap() returns. If one call raises, the others are
+cancelled and the exception reaches the consumer.
+"""
+
+import asyncio
+import random
+import sys
+import time
+from collections import deque
+
+
+async def amap(coro_fn, iterable, limit=10, ordered=True):
+    """Async generator applying coro_fn to every item with bounded concurrency."""
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    if hasattr(iterable, "__aiter__"):
+        source = iterable.__aiter__()
+
+        async def next_item():
+            return await source.__anext__()
+    else:
+        source = iter(iterable)
+
+        async def next_item():
+            try:
+                return next(source)
+            except StopIteration:
+                raise StopAsyncIteration from None
+
+    in_flight = deque() if ordered else set()
+    exhausted = False
+
+    async def fill():
+        nonlocal exhausted
+        while not exhausted and len(in_flight) < limit:
+            try:
+                item = await next_item()
+            except StopAsyncIteration:
+                exhausted = True
+                return
+            task = asyncio.ensure_future(coro_fn(item))
+            in_flight.append(task) if ordered else in_flight.add(task)
+
+    try:
+        await fill()
+        while in_flight:
+            if ordered:
+                task = in_flight.popleft()
+                result = await task
+                await fill()
+                yield result
+            else:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                await fill()
+                for task in done:
+                    yield task.result()
+    finally:
+        # Runs when we finish, on errors, on cancellation and on early exit.
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+# A local stand-in for network I/O: waits a random time, then returns its input.
+async def fake_io(x, latency=0.01, jitter=0.5):
+    await asyncio.sleep(latency * random.uniform(1 - jitter, 1 + jitter))
+    return x
+
+
+async def benchmark(n=1000, latency=0.01, limits=(1, 10, 100, 1000)):
+    async def timed_call(x, latencies):
+        start = time.perf_counter()
+        result = await fake_io(x, latency)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    async def sequential(latencies):
+        for x in range(n):
+            await timed_call(x, latencies)
+
+    async def concurrent(limit, ordered, latencies):
+        async for _ in amap(lambda x: timed_call(x, latencies), range(n), limit=limit, ordered=ordered):
+            pass
+
+    print(f"n={n} calls, simulated latency {latency * 1e3:.0f} ms")
+    print(f"{'mode':<28} {'total (s)':>10} {'items/s':>10} {'mean latency (ms)':>18}")
+    runs = [("sequential await", sequential)]
+    for limit in limits:
+        for ordered in (True, False):
+            label = f"amap limit={limit} {'ordered' if ordered else 'unordered'}"
+            runs.append((label, lambda lat, limit=limit, ordered=ordered: concurrent(limit, ordered, lat)))
+    for label, run in runs:
+        latencies = []
+        start = time.perf_counter()
+        await run(latencies)
+        total = time.perf_counter() - start
+        mean = sum(latencies) / len(latencies)
+        print(f"{label:<28} {total:>10.3f} {n / total:>10.0f} {mean * 1e3:>18.2f}")
+
+
+async def main():
+    # Example 1: ordered results, like map()
+    print([x async for x in amap(fake_io, [1, 2, 3, 4, 5], limit=2)])     # Output: [1, 2, 3, 4, 5]
+
+    # Example 2: completion order
+    print(sorted([x async for x in amap(fake_io, range(5), ordered=False)]))  # Output: [0, 1, 2, 3, 4]
+
+    # Example 3: stopping early cancels the calls still in flight
+    results = amap(fake_io, range(100), limit=10)
+    async for x in results:
+        if x == 2:
+            break
+    await results.aclose()
+    print("stopped after", x)                                              # Output: stopped after 2
+
+    # Example 4: an exception in one call reaches the consumer
+    async def fails_on_three(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return await fake_io(x)
+
+    try:
+        async for _ in amap(fails_on_three, range(10)):
+            pass
+    except ValueError as exc:
+        print("error:", exc)                                               # Output: error: bad item
+
+    if "--bench" in sys.argv:
+        await benchmark()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+# Summary:
+# - map() cannot run coroutines; amap() awaits them with a bounded number in flight.
+# - A bounded window keeps memory flat and reads the input lazily.
+# - Cleaning up in `finally` makes early exit and cancellation safe.
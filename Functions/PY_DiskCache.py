@@ -0,0 +1,332 @@
+"""
+Persistent Memoization on Disk
+
+@memoize (PY_Memoize.py) keeps results in memory, so they are lost when the
+script exits and the next run computes everything again. @disk_cache stores
+the results in a small sqlite database instead, so a second run of the same
+script ("warm start") reads them back:
+
+    @disk_cache
+    def slow_square(x):
+        time.sleep(1)
+        return x * x
+
+    slow_square(12)   # first run of the script: 1 s, the result is saved
+    slow_square(12)   # every later run, even in a new process: ~0.1 ms
+
+How an entry is found again:
+
+- fingerprint: a SHA-256 hash of the function's bytecode, constants, names,
+  default values and closure values, plus the Python version (bytecode
+  differs between versions). If you edit the function body, the fingerprint
+  changes, so old results are never returned for new code. When a new
+  version of the code is decorated, the entries of older code are deleted.
+  Closures made by one factory share their code and differ only in the
+  captured values, so they keep each other's entries.
+- argument key: a SHA-256 hash of the pickled arguments, with keyword
+  arguments sorted and sets/dicts put in a fixed order.
+
+The database is capped at max_bytes of pickled results; when it is full, the
+least recently used entries are deleted. A cache hit only notes the time in
+memory; the notes are written with the next set(), at close(), or after
+TOUCH_INTERVAL seconds, so reads don't turn into database writes.
+
+Limitations: only the decorated function's own code is fingerprinted. If it
+calls a helper and the helper changes, call f.cache_clear(). Arguments and
+results must be picklable.
+"""
+
+import atexit
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter, namedtuple
+
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "py_basic", "results.sqlite")
+DiskCacheInfo = namedtuple("DiskCacheInfo", "hits misses evictions entries bytes max_bytes")
+_PROTOCOL = 4   # a fixed pickle protocol, so the same arguments always give the same bytes
+TOUCH_INTERVAL = 60.0   # seconds a hit's last_used may wait in memory before it is written
+_EVICT_BATCH = 64       # rows looked at per eviction query
+
+
+# Topic 1: Fingerprinting a function
+def _code_parts(code):
+    parts = [code.co_code, code.co_names, code.co_varnames, code.co_argcount, code.co_kwonlyargcount]
+    parts.extend(_const_part(const) for const in code.co_consts)
+    return parts
+
+
+def _const_part(const):
+    """Describe a constant the same way in every process."""
+    if isinstance(const, types.CodeType):
+        return _code_parts(const)
+    if isinstance(const, tuple):
+        return ("tuple", [_const_part(item) for item in const])
+    if isinstance(const, frozenset):
+        # `x in {"a", "b"}` compiles to a frozenset, whose repr order changes with hash randomization
+        return ("frozenset", sorted(repr(_const_part(item)) for item in const))
+    return repr(const)
+
+
+def fingerprint(func, _seen=None):
+    """Return a hex digest that changes whenever func's code or captured values change."""
+    seen = set() if _seen is None else _seen
+    seen.add(func.__code__)
+    closure = []
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:   # not assigned yet, e.g. a nested function decorated where it is defined
+            closure.append("<empty cell>")
+        else:
+            closure.append(_captured(value, seen))
+    parts = [sys.implementation.cache_tag, func.__module__, func.__qualname__,
+             _code_parts(func.__code__), repr(func.__defaults__), repr(func.__kwdefaults__), closure]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def code_fingerprint(func):
+    """Like fingerprint(), but without defaults and closure values: the same for every closure of a factory."""
+    parts = [sys.implementation.cache_tag, func.__module__, func.__qualname__, _code_parts(func.__code__)]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _captured(value, seen):
+    if isinstance(value, types.FunctionType):
+        while hasattr(value, "__wrapped__"):   # look through decorators, e.g. an earlier @disk_cache
+            value = value.__wrapped__
+        if value.__code__ in seen:
+            return f"<recursive {value.__qualname__}>"   # a closure that refers to itself
+        return fingerprint(value, seen)   # e.g. a helper captured by a closure
+    try:
+        return _stable(value)
+    except Exception:
+        return repr(value)   # may contain an address: then every run gets a new fingerprint
+
+
+# Topic 2: Stable argument keys
+def _stable(value):
+    """Return bytes that are equal whenever value is equal, also across processes."""
+    if isinstance(value, dict):
+        items = sorted((_stable(k), _stable(v)) for k, v in value.items())
+        return b"d" + pickle.dumps(items, _PROTOCOL)
+    if isinstance(value, (set, frozenset)):
+        return b"s" + pickle.dumps(sorted(_stable(v) for v in value), _PROTOCOL)
+    if isinstance(value, (list, tuple)):
+        return b"l" + pickle.dumps([type(value).__name__] + [_stable(v) for v in value], _PROTOCOL)
+    return pickle.dumps(value, _PROTOCOL)
+
+
+def argument_key(args, kwargs):
+    return hashlib.sha256(_stable([list(args), dict(kwargs)])).hexdigest()
+
+
+# Topic 3: The sqlite store
+class DiskCache:
+    """A size-capped table of pickled results, shared by every decorated function."""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=100 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._counts = Counter()   # (function, "hits" or "misses") -> number
+        self._touched = {}         # (fingerprint, key) -> time of the last hit, not yet written
+        self._touched_since = None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")  # readers in other processes don't block writers
+        self._db.execute("PRAGMA recursive_triggers=ON")  # INSERT OR REPLACE fires the delete trigger too
+        self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+            function    TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            key         TEXT NOT NULL,
+            value       BLOB NOT NULL,
+            size        INTEGER NOT NULL,
+            last_used   REAL NOT NULL,
+            code        TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (fingerprint, key))""")
+        if "code" not in {row[1] for row in self._db.execute("PRAGMA table_info(results)")}:
+            self._db.execute("ALTER TABLE results ADD COLUMN code TEXT NOT NULL DEFAULT ''")  # older file
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_by_age ON results (last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_by_function ON results (function, code)")
+        # One row with the total size, kept up to date by triggers, so set() never sums the table.
+        self._db.execute("""CREATE TABLE IF NOT EXISTS totals (
+            id    INTEGER PRIMARY KEY CHECK (id = 0),
+            bytes INTEGER NOT NULL)""")
+        self._db.execute("INSERT OR IGNORE INTO totals SELECT 0, COALESCE(SUM(size), 0) FROM results")
+        self._db.execute("""CREATE TRIGGER IF NOT EXISTS results_added AFTER INSERT ON results
+            BEGIN UPDATE totals SET bytes = bytes + NEW.size; END""")
+        self._db.execute("""CREATE TRIGGER IF NOT EXISTS results_deleted AFTER DELETE ON results
+            BEGIN UPDATE totals SET bytes = bytes - OLD.size; END""")
+
+    def get(self, function, fp, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE fingerprint = ? AND key = ?",
+                                   (fp, key)).fetchone()
+            if row is None:
+                self._counts[function, "misses"] += 1
+                return False, None
+            self._counts[function, "hits"] += 1
+            now = time.time()
+            self._touched[fp, key] = now
+            if self._touched_since is None:
+                self._touched_since = now
+            elif now - self._touched_since > TOUCH_INTERVAL:
+                self._write(self._flush_touched)
+        return True, pickle.loads(row[0])
+
+    def set(self, function, fp, key, value, code=""):
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return  # larger than the whole cache
+
+        def insert():
+            self._flush_touched()   # so eviction sees the real order of use
+            self._db.execute("INSERT OR REPLACE INTO results (function, fingerprint, key, value, size, "
+                             "last_used, code) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (function, fp, key, blob, len(blob), time.time(), code))
+            self._evict()
+
+        with self._lock:
+            self._write(insert)
+
+    def _write(self, step):
+        """Run step() in one write transaction; the caller holds self._lock."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            step()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany("UPDATE results SET last_used = ? WHERE fingerprint = ? AND key = ?",
+                                 [(when, fp, key) for (fp, key), when in self._touched.items()])
+            self._touched.clear()
+        self._touched_since = None
+
+    def _evict(self):
+        total = self._db.execute("SELECT bytes FROM totals").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._db.execute("SELECT rowid, size FROM results ORDER BY last_used LIMIT ?",
+                                    (_EVICT_BATCH,)).fetchall()
+            if not rows:
+                break
+            victims = []
+            for rowid, size in rows:
+                victims.append((rowid,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            self._db.executemany("DELETE FROM results WHERE rowid = ?", victims)
+            self.evictions += len(victims)
+
+    def forget(self, function, keep_code=None):
+        """Delete the entries of function (all, or all stored by code other than keep_code)."""
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE function = ? AND code != ?",
+                             (function, keep_code or ""))
+
+    def info(self, function):
+        """Hits and misses of function in this process; entries and bytes of function on disk."""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results WHERE function = ?", (function,)).fetchone()
+        return DiskCacheInfo(self._counts[function, "hits"], self._counts[function, "misses"],
+                             self.evictions, entries, size, self.max_bytes)
+
+    def flush(self):
+        """Write the last_used times of recent hits."""
+        with self._lock:
+            if self._touched:
+                self._write(self._flush_touched)
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+
+_stores = {}   # (path, max_bytes) -> DiskCache, so decorated functions share a connection
+
+
+def disk_cache(func=None, *, path=DEFAULT_PATH, max_bytes=100 * 2**20):
+    """Cache func's results in a sqlite file. Use as @disk_cache or @disk_cache(path=...)."""
+    if func is None:
+        return functools.partial(disk_cache, path=path, max_bytes=max_bytes)
+    store = _stores.get((path, max_bytes))
+    if store is None:
+        store = _stores[path, max_bytes] = DiskCache(path, max_bytes)
+        atexit.register(store.flush)   # hits not written yet still count for the next run's LRU order
+    name = f"{func.__module__}.{func.__qualname__}"
+    fp, code = fingerprint(func), code_fingerprint(func)
+    store.forget(name, keep_code=code)   # results of older code can never be used
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = argument_key(args, kwargs)
+        found, value = store.get(name, fp, key)
+        if not found:
+            value = func(*args, **kwargs)
+            store.set(name, fp, key, value, code)
+        return value
+
+    wrapper.fingerprint = fp
+    wrapper.cache = store
+    wrapper.cache_info = lambda: store.info(name)
+    wrapper.cache_clear = lambda: store.forget(name)
+    return wrapper
+
+
+if __name__ == "__main__":
+    demo_path = os.path.join(tempfile.gettempdir(), "py_basic_disk_cache_demo.sqlite")
+
+    # Example 1: run this file twice - the second run finds both results on disk
+    @disk_cache(path=demo_path)
+    def slow_square(x):
+        time.sleep(0.5)
+        return x * x
+
+    start = time.perf_counter()
+    print(slow_square(12), slow_square(12))   # Output: 144 144
+    print(f"{time.perf_counter() - start:.1f} s", slow_square.cache_info())
+    # First run:  0.5 s DiskCacheInfo(hits=1, misses=1, ...)
+    # Second run: 0.0 s DiskCacheInfo(hits=2, misses=0, ...)
+
+    # Example 2: changing the body changes the fingerprint, so old results are not used
+    def step(x):
+        return x + 1
+    old = fingerprint(step)
+
+    def step(x):
+        return x + 2
+    print(old == fingerprint(step))           # Output: False
+
+    # Example 3: keyword order and dict/set order do not change the key
+    print(argument_key((1,), {"a": 1, "b": {3, 2}}) == argument_key((1,), {"b": {2, 3}, "a": 1}))  # Output: True
+
+    # Example 4: a tiny size cap evicts the least recently used results
+    @disk_cache(path=demo_path.replace(".sqlite", "_small.sqlite"), max_bytes=5000)
+    def block(n):
+        return bytes(n)
+
+    block.cache_clear()
+    for n in (2000, 2000, 1500, 2500):
+        block(n)
+    print(block.cache_info().entries)         # Output: 2 (the 2000-byte result was evicted)
+
+# Summary:
+# - A disk cache lets results survive the process, so warm starts skip the work.
+# - Hashing the bytecode ties every stored result to the exact code that produced it.
+# - Capping the size and evicting the least recently used entries keeps the file small.
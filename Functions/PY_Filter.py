@@ -23,4 +23,6 @@ print(positive_numbers)  # Output: [1, 2]
 
 # Summary:
 # The filter() function is a useful tool for extracting elements from a
-# collection based on a specified condition.
\ No newline at end of file
+# collection based on a specified condition.
+
+# For array.array and NumPy data, PY_MaskFilter.py selects elements with one vectorized boolean mask.
@@ -55,6 +55,7 @@ def multiply(*args):
     return result
 
 print(multiply(2, 3, 4))  # 24
+# For products of many huge integers, Recursion/PY_ParallelProduct.py has a multi-process version.
 
 # Example 6: Function with Arbitrary Keyword Arguments
 # What is arbitrary keyword arguments?
@@ -107,6 +108,8 @@ def calculate(operation, a, b):
 
 print(calculate("add", 5, 3))        # 8
 print(calculate("multiply", 5, 3))   # 15
+# For calling this millions of times, PY_Dispatch.py registers the operations once in a dict
+# and offers calculate_batch(), which runs each operation on all its rows at once.
 
 
 # Example 10: Lambda Functions
@@ -179,6 +182,9 @@ def factorial(n):
     else:
         return n * factorial(n - 1)
 print(factorial(5))  # Output: 120
+# Note: multiplying one term at a time gets slow for large n (tens of thousands and up).
+# See Recursion/PY_Factorial.py for product-tree and prime-swing versions.
+# To cache results of repeated calls with the same arguments, see PY_Memoize.py (@memoize).
 
 
 """
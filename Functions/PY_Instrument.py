@@ -0,0 +1,326 @@
+"""
+Measuring Functions: call counts and latency histograms
+
+@instrument wraps a function and records, for every call,
+
+- the number of calls (always, it costs one counter step)
+- the number of calls that raised (always)
+- how long the call took, in a histogram (for a sample of the calls)
+
+    @instrument
+    def add(a, b):
+        return a + b
+
+    @instrument(sample_rate=0.01)     # time only every 100th call
+    def multiply(x, y):
+        return x * y
+
+Why a histogram and not an average: latency is usually skewed. Most calls are
+fast and a few are very slow, and those few are what users notice. The
+percentiles p50 (the median), p95 and p99 ("99% of calls were faster than
+this") describe that; an average hides it.
+
+Log buckets: storing every single duration would grow without limit. Instead
+each duration is counted in a bucket, and the buckets grow with the duration:
+four per power of two (512-640 ns, 640-768 ns, 768-896 ns, 896-1024 ns,
+1024-1280 ns, ...). So every percentile is accurate to 25% or better, whether
+it is 300 ns or 3 s, and the whole histogram is a small dict of counts.
+
+Overhead: an unsampled call only steps a counter, which adds roughly 0.2 us;
+a timed call costs about 1 us more (two clock reads and a locked update).
+For a function that takes 10 us or longer, sample_rate=0.1 keeps that to a few
+percent. For a one-line function like add() any wrapper costs more than the
+function itself; instrument the loop around it instead.
+
+Output:
+- snapshot()            -> dict of all instrumented functions
+- dump_json(path)       -> the same as a JSON file
+- dump_prometheus(path) -> Prometheus text format (counters, histogram buckets,
+                           quantiles), the format a Prometheus server scrapes or
+                           node_exporter's textfile collector reads
+- scrape(path)          -> a tiny stand-in for a scraper that reads such a file
+Both files are written to a temporary file and moved into place with
+os.replace(), so a reader never sees half a file.
+"""
+
+import functools
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+
+SUB_BUCKETS = 4     # buckets per power of two (2 bits of mantissa)
+REGISTRY = {}       # function name -> Stats
+
+
+# Topic 1: A log-bucketed histogram
+def bucket_of(ns):
+    """Index of the bucket holding a duration of ns nanoseconds."""
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return (bits - 2) * SUB_BUCKETS + ((ns >> (bits - 3)) & (SUB_BUCKETS - 1))
+
+
+def bucket_upper_bound(index):
+    """Smallest duration (ns) that no longer falls into bucket index."""
+    if index < SUB_BUCKETS:
+        return index + 1
+    bits, sub = divmod(index, SUB_BUCKETS)
+    return (SUB_BUCKETS + sub + 1) << (bits - 1)
+
+
+class Stats:
+    def __init__(self, name, sample_rate):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.calls = itertools.count()   # next() on it is atomic, so no lock per call
+        self._reads = 0                  # values of self.calls taken by call_count, not by calls
+        self.errors = 0
+        self.buckets = {}                # bucket index -> number of sampled calls
+        self.sampled = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.lock = threading.Lock()
+
+    def record(self, ns):
+        index = bucket_of(ns)
+        with self.lock:
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+            self.sampled += 1
+            self.total_ns += ns
+            if ns > self.max_ns:
+                self.max_ns = ns
+
+    def record_error(self):
+        with self.lock:
+            self.errors += 1
+
+    @property
+    def call_count(self):
+        # itertools.count has no public value, so take one from it ourselves and
+        # subtract the values that earlier reads took.
+        with self.lock:
+            count = next(self.calls) - self._reads
+            self._reads += 1
+        return count
+
+    def percentile(self, p):
+        """Upper bound (seconds) of the bucket containing the p-th percentile of sampled calls."""
+        with self.lock:
+            buckets, sampled = sorted(self.buckets.items()), self.sampled
+        if not sampled:
+            return None
+        rank = p / 100 * sampled
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen >= rank:
+                return bucket_upper_bound(index) / 1e9
+        return bucket_upper_bound(buckets[-1][0]) / 1e9
+
+    def summary(self):
+        sampled = self.sampled
+        return {
+            "calls": self.call_count,
+            "errors": self.errors,
+            "sampled": sampled,
+            "sample_rate": self.sample_rate,
+            "mean_seconds": self.total_ns / sampled / 1e9 if sampled else None,
+            "max_seconds": self.max_ns / 1e9 if sampled else None,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "p99_seconds": self.percentile(99),
+        }
+
+
+# Topic 2: The decorator
+def instrument(func=None, *, name=None, sample_rate=1.0):
+    """Count every call of func and time a sample_rate fraction of them."""
+    if func is None:
+        return functools.partial(instrument, name=name, sample_rate=sample_rate)
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate must be in (0, 1]")
+    name = name or f"{func.__module__}.{func.__qualname__}"
+    stats = REGISTRY[name] = Stats(name, sample_rate)
+    every = round(1 / sample_rate)   # time every n-th call: cheaper and steadier than random()
+    calls, clock, record = stats.calls, time.perf_counter_ns, stats.record
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if next(calls) % every:
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                stats.record_error()
+                raise
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            stats.record_error()
+            raise
+        finally:
+            record(clock() - start)
+
+    wrapper.stats = stats
+    return wrapper
+
+
+def snapshot():
+    return {name: stats.summary() for name, stats in REGISTRY.items()}
+
+
+def reset():
+    REGISTRY.clear()
+
+
+# Topic 3: Writing JSON and Prometheus text files
+def _write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".instrument-")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def dump_json(path):
+    _write_atomic(path, json.dumps(snapshot(), indent=2) + "\n")
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    lines = [
+        "# HELP function_calls_total Number of calls, sampled or not.",
+        "# TYPE function_calls_total counter",
+    ]
+    for name, stats in REGISTRY.items():
+        lines.append(f'function_calls_total{{function="{_label(name)}"}} {stats.call_count}')
+    lines += ["# HELP function_errors_total Number of calls that raised.",
+              "# TYPE function_errors_total counter"]
+    for name, stats in REGISTRY.items():
+        lines.append(f'function_errors_total{{function="{_label(name)}"}} {stats.errors}')
+    lines += ["# HELP function_latency_seconds Latency of sampled calls.",
+              "# TYPE function_latency_seconds histogram"]
+    for name, stats in REGISTRY.items():
+        label = _label(name)
+        with stats.lock:
+            buckets, sampled, total = sorted(stats.buckets.items()), stats.sampled, stats.total_ns
+        cumulative = 0
+        for index, count in buckets:
+            cumulative += count
+            le = bucket_upper_bound(index) / 1e9
+            lines.append(f'function_latency_seconds_bucket{{function="{label}",le="{le:.9g}"}} {cumulative}')
+        lines.append(f'function_latency_seconds_bucket{{function="{label}",le="+Inf"}} {sampled}')
+        lines.append(f'function_latency_seconds_sum{{function="{label}"}} {total / 1e9:.9g}')
+        lines.append(f'function_latency_seconds_count{{function="{label}"}} {sampled}')
+    lines += ["# HELP function_latency_quantile_seconds Percentiles of sampled call latency.",
+              "# TYPE function_latency_quantile_seconds gauge"]
+    for name, stats in REGISTRY.items():
+        for q in (50, 95, 99):
+            value = stats.percentile(q)
+            if value is not None:
+                lines.append(f'function_latency_quantile_seconds{{function="{_label(name)}",'
+                             f'quantile="{q / 100}"}} {value:.9g}')
+    return "\n".join(lines) + "\n"
+
+
+def dump_prometheus(path):
+    _write_atomic(path, prometheus_text())
+
+
+def scrape(path):
+    """Read a Prometheus text file into {(metric, labels...): value}, as a scraper would."""
+    samples = {}
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            series, value = line.rsplit(" ", 1)
+            metric, _, labels = series.partition("{")
+            pairs = tuple(sorted(part.split("=", 1) for part in labels.rstrip("}").split('",') if part))
+            samples[(metric,) + tuple((k, v.strip('"')) for k, v in pairs)] = float(value)
+    return samples
+
+
+# Example functions from PY_Functions.py
+def add(a, b):
+    return a + b
+
+
+def multiply(x, y):
+    return x * y
+
+
+def greet_user(name="Guest"):
+    return f"Hello, {name}!"
+
+
+def print_info(**kwargs):
+    return ", ".join(f"{key}: {value}" for key, value in kwargs.items())
+
+
+def work(n=1000):
+    return sum(i * i for i in range(n))   # tens of microseconds
+
+
+def benchmark(repeat=5):
+    # The fastest of several runs is the least disturbed by other processes.
+    def best(func, number):
+        return min(timeit.repeat(lambda: func(3, 4), number=number, repeat=repeat)) / number
+
+    print(f"{'function':<10} {'sample_rate':>11} {'ns/call':>9} {'overhead':>9}")
+    for label, func, number in (("add", add, 10**5), ("work", lambda a, b: work(), 10**3)):
+        base = best(func, number)
+        print(f"{label:<10} {'(plain)':>11} {base * 1e9:>9.0f}")
+        for rate in (1.0, 0.1, 0.01):
+            elapsed = best(instrument(func, name=f"bench.{label}.{rate}", sample_rate=rate), number)
+            print(f"{label:<10} {rate:>11} {elapsed * 1e9:>9.0f} {elapsed / base - 1:>9.1%}")
+
+
+if __name__ == "__main__":
+    # Example 1: instrumenting the functions from PY_Functions.py
+    add = instrument(add)
+    multiply = instrument(sample_rate=0.5)(multiply)
+    greet_user, print_info = instrument(greet_user), instrument(print_info)
+    for i in range(1000):
+        add(i, 1)
+        multiply(i, 2)
+    greet_user("Alice")
+    print_info(name="Alice", age=30)
+    print(add.stats.call_count, multiply.stats.call_count, multiply.stats.sampled)  # Output: 1000 1000 500
+    print(sorted(snapshot()["__main__.add"]))
+    # Output: ['calls', 'errors', 'max_seconds', 'mean_seconds', 'p50_seconds', 'p95_seconds', ...]
+
+    # Example 2: log buckets - four per power of two
+    print([bucket_of(ns) for ns in (1000, 1100, 1300, 1600, 1900)])  # Output: [35, 36, 37, 38, 39]
+    print(bucket_upper_bound(bucket_of(1000)))                     # Output: 1024
+
+    # Example 3: JSON and Prometheus files, read back by a scrape stand-in
+    directory = tempfile.gettempdir()
+    dump_json(os.path.join(directory, "functions.json"))
+    prom_path = os.path.join(directory, "functions.prom")
+    dump_prometheus(prom_path)
+    samples = scrape(prom_path)
+    print(samples[("function_calls_total", ("function", "__main__.greet_user"))])  # Output: 1.0
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Percentiles from a histogram show the slow calls that an average hides.
+# - Log-sized buckets keep every percentile within a fixed relative error in a few counters.
+# - Sampling keeps the cost of measuring small in hot loops.
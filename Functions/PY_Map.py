@@ -113,3 +113,5 @@ print(list(string_numbers))  # Output: ['1', '2', '3', '4', '5']
 # the results. It's often used for transforming data in a concise and readable way.
 
 
+
+# To run map() over many cores or threads, see PY_ParallelMap.py (pmap).
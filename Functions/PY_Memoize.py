@@ -0,0 +1,437 @@
+"""
+Memoization: remembering results of earlier calls
+
+A pure function (same arguments -> same result, no side effects) never has to
+compute the same answer twice. @memoize stores every result in a cache keyed
+by the arguments and returns the stored value on the next call:
+
+    @memoize
+    def fib(n):
+        return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+    fib(200)   # 201 calls instead of about 10^41
+
+functools.lru_cache does the LRU part of this. @memoize adds:
+
+- policy="lru"   evict the entry that was used least recently (default)
+  policy="lfu"   evict the entry that was used least often
+  policy="ttl"   entries expire ttl seconds after they were stored
+- maxsize        at most this many entries (None = unlimited)
+  maxbytes       at most this many bytes of keys + values (measured with
+                 sys.getsizeof, or your own sizeof= function)
+- typed=True     1 and 1.0 get different entries (they are == in Python)
+- normalize=True f(1, 2), f(1, b=2) and f(b=2, a=1) share one entry, and so
+                 does f(1) if b defaults to 2: arguments are bound to the
+                 signature before building the key
+- unhashable arguments (lists, dicts, sets) are turned into hashable tuples
+- counters       f.cache_info() -> hits, misses, evictions, expirations, size
+- thread_safe=True  a lock protects the cache, for servers with many threads
+- async def      awaits the coroutine and caches its *result*. Concurrent
+                 calls with the same arguments wait for one shared computation
+                 instead of starting it several times.
+"""
+
+import asyncio
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions expirations size bytes maxsize maxbytes")
+_MISSING = object()
+_FROZEN = object()   # tags frozen lists/dicts/sets; no argument can contain it, so no key collides
+_RETRY = object()    # result of an async call whose first caller was cancelled
+
+
+# Topic 1: Building a cache key from *args and **kwargs
+def _freeze(value, typed=False):
+    """Return a hashable stand-in for value (lists, dicts and sets included)."""
+    try:
+        hash(value)
+        return (value, type(value)) if typed else value
+    except TypeError:
+        pass
+    if isinstance(value, (list, tuple)):
+        return (_FROZEN, type(value).__name__, tuple(_freeze(v, typed) for v in value))
+    if isinstance(value, dict):
+        items = ((_freeze(k, typed), _freeze(v, typed)) for k, v in value.items())
+        return (_FROZEN, "dict", tuple(sorted(items, key=repr)))
+    if isinstance(value, (set, frozenset)):
+        return (_FROZEN, type(value).__name__, frozenset(_freeze(v, typed) for v in value))
+    raise TypeError(f"cannot memoize an argument of type {type(value).__name__}")
+
+
+def make_key(args, kwargs, typed=False, signature=None):
+    """Return a hashable key for one call."""
+    if not kwargs and not typed and signature is None:
+        try:
+            hash(args)
+            return args  # the common case: a few hashable positional arguments
+        except TypeError:
+            pass
+    if signature is not None:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        args, kwargs = (), bound.arguments   # every argument by name, in signature order
+    key = tuple(_freeze(value, typed) for value in args)
+    if kwargs:
+        items = kwargs.items() if signature is not None else sorted(kwargs.items())
+        key += (_MISSING,) + tuple((name, _freeze(value, typed)) for name, value in items)
+    return key
+
+
+# Topic 2: Eviction policies
+class _Cache:
+    """Counters and the byte budget shared by all policies."""
+
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda key, value: sys.getsizeof(key) + sys.getsizeof(value))
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.bytes = 0
+        self._sizes = {}
+
+    def get(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        size = self.sizeof(key, value) if self.maxbytes is not None else 0
+        if self.maxsize == 0 or (self.maxbytes is not None and size > self.maxbytes):
+            return  # would never fit; don't flush the whole cache for it
+        if key in self._sizes:
+            self._remove(key)
+        self._expire()
+        # Make room before storing: otherwise the new entry could be its own victim
+        # (in LFUCache it has the lowest count, so a full cache would never admit a new key).
+        while self._sizes and ((self.maxsize is not None and len(self._sizes) >= self.maxsize)
+                               or (self.maxbytes is not None and self.bytes + size > self.maxbytes)):
+            self._remove(self._victim())
+            self.evictions += 1
+        self._store(key, value)
+        self._sizes[key] = size
+        self.bytes += size
+
+    def _expire(self):
+        pass   # only TTLCache has entries that expire
+
+    def _remove(self, key):
+        self._discard(key)
+        self.bytes -= self._sizes.pop(key)
+
+    def clear(self):
+        for key in list(self._sizes):
+            self._remove(key)
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.expirations,
+                         len(self._sizes), self.bytes, self.maxsize, self.maxbytes)
+
+
+class LRUCache(_Cache):
+    """Evicts the least recently used entry."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._data = OrderedDict()
+
+    def _lookup(self, key):
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        self._data[key] = value
+
+    def _discard(self, key):
+        del self._data[key]
+
+    def _victim(self):
+        return next(iter(self._data))
+
+
+class LFUCache(_Cache):
+    """Evicts the least frequently used entry (the oldest one among ties).
+
+    Entries are grouped by use count, so finding the victim is O(1):
+    self._buckets[count] is an OrderedDict of the keys used `count` times.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._data = {}        # key -> [value, count]
+        self._buckets = {}     # count -> OrderedDict of keys
+        self._min_count = 0
+
+    def _touch(self, key, entry):
+        bucket = self._buckets[entry[1]]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry[1]]
+            if self._min_count == entry[1]:
+                self._min_count += 1
+        entry[1] += 1
+        self._buckets.setdefault(entry[1], OrderedDict())[key] = None
+
+    def _lookup(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        self._touch(key, entry)
+        return entry[0]
+
+    def _store(self, key, value):
+        self._data[key] = [value, 1]
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+
+    def _discard(self, key):
+        count = self._data.pop(key)[1]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def _victim(self):
+        if self._min_count not in self._buckets:
+            self._min_count = min(self._buckets)
+        return next(iter(self._buckets[self._min_count]))
+
+
+class TTLCache(_Cache):
+    """Entries expire `ttl` seconds after they were stored; the oldest is evicted first."""
+
+    def __init__(self, ttl, *args, timer=time.monotonic, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ttl = ttl
+        self.timer = timer
+        self._data = OrderedDict()   # key -> (expires_at, value), oldest first
+
+    def _expire(self):
+        now = self.timer()
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def _lookup(self, key):
+        self._expire()
+        entry = self._data.get(key)
+        return _MISSING if entry is None else entry[1]
+
+    def _store(self, key, value):
+        self._expire()
+        self._data[key] = (self.timer() + self.ttl, value)
+
+    def _discard(self, key):
+        del self._data[key]
+
+    def _victim(self):
+        return next(iter(self._data))
+
+
+_POLICIES = {"lru": LRUCache, "lfu": LFUCache, "ttl": TTLCache}
+
+
+# Topic 3: The decorator
+def memoize(func=None, *, policy="lru", maxsize=128, maxbytes=None, ttl=None, typed=False,
+            normalize=False, thread_safe=False, sizeof=None):
+    """Cache the results of func. Use as @memoize or @memoize(policy=..., ...)."""
+    if func is None:
+        return functools.partial(memoize, policy=policy, maxsize=maxsize, maxbytes=maxbytes, ttl=ttl,
+                                 typed=typed, normalize=normalize, thread_safe=thread_safe, sizeof=sizeof)
+    if policy not in _POLICIES:
+        raise ValueError(f"policy must be one of {sorted(_POLICIES)}, not {policy!r}")
+    if (policy == "ttl") != (ttl is not None):
+        raise ValueError("ttl= is required for policy='ttl' and only allowed there")
+    if policy == "ttl":
+        cache = TTLCache(ttl, maxsize, maxbytes, sizeof)
+    else:
+        cache = _POLICIES[policy](maxsize, maxbytes, sizeof)
+    signature = inspect.signature(func) if normalize else None
+    lock = threading.RLock() if thread_safe else None
+
+    if inspect.iscoroutinefunction(func):
+        pending = {}   # key -> Future of a call that is still running
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs, typed, signature)
+            while True:
+                value = _get(cache, lock, key)
+                if value is not _MISSING:
+                    return value
+                if key not in pending:
+                    break
+                value = await asyncio.shield(pending[key])
+                if value is not _RETRY:
+                    return value
+                # The call we waited for was cancelled, not us: look again, maybe run it ourselves.
+            future = asyncio.get_running_loop().create_future()
+            pending[key] = future
+            try:
+                value = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.set_result(_RETRY)   # wake the waiters without cancelling them
+                raise
+            except BaseException as exc:
+                future.set_exception(exc)
+                future.exception()  # mark as retrieved if nobody else was waiting
+                raise
+            else:
+                _set(cache, lock, key, value)
+                future.set_result(value)
+                return value
+            finally:
+                del pending[key]
+    elif lock is None:
+        get, put = cache.get, cache.set
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs, typed, signature)
+            value = get(key)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                put(key, value)
+            return value
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs, typed, signature)
+            with lock:
+                value = cache.get(key)
+            if value is _MISSING:
+                # The call itself runs outside the lock, like functools.lru_cache:
+                # two threads may compute the same value, but never block each other.
+                value = func(*args, **kwargs)
+                with lock:
+                    cache.set(key, value)
+            return value
+
+    def cache_clear():
+        if lock is None:
+            cache.clear()
+        else:
+            with lock:
+                cache.clear()
+
+    wrapper.cache = cache
+    wrapper.cache_info = cache.info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def _get(cache, lock, key):
+    if lock is None:
+        return cache.get(key)
+    with lock:
+        return cache.get(key)
+
+
+def _set(cache, lock, key, value):
+    if lock is None:
+        cache.set(key, value)
+    else:
+        with lock:
+            cache.set(key, value)
+
+
+def benchmark(n=10**5, distinct=1000):
+    import random
+
+    def square(x):
+        return x * x
+
+    keys = [random.randrange(distinct) for _ in range(n)]
+    variants = [
+        ("no cache", square),
+        ("functools.lru_cache", lru_cache(maxsize=distinct // 2)(square)),
+        ("memoize lru", memoize(maxsize=distinct // 2)(square)),
+        ("memoize lfu", memoize(policy="lfu", maxsize=distinct // 2)(square)),
+        ("memoize ttl", memoize(policy="ttl", ttl=60, maxsize=distinct // 2)(square)),
+        ("memoize lru thread_safe", memoize(maxsize=distinct // 2, thread_safe=True)(square)),
+    ]
+    print(f"{n} calls, {distinct} distinct arguments, room for {distinct // 2}")
+    for label, func in variants:
+        start = time.perf_counter()
+        for k in keys:
+            func(k)
+        elapsed = time.perf_counter() - start
+        info = func.cache_info() if hasattr(func, "cache_info") else None
+        hits = f"hit rate {info.hits / n:.0%}" if info else ""
+        print(f"{label:<24} {elapsed / n * 1e9:>7.0f} ns/call   {hits}")
+
+
+if __name__ == "__main__":
+    # Example 1: factorial from PY_Functions.py
+    @memoize
+    def factorial(n):
+        return 1 if n <= 1 else n * factorial(n - 1)
+
+    print(factorial(5), factorial(6))   # Output: 120 720
+    print(factorial.cache_info())
+    # Output: CacheInfo(hits=1, misses=6, evictions=0, expirations=0, size=6, bytes=0, maxsize=128, maxbytes=None)
+
+    # Example 2: calculate() with normalized keyword arguments
+    @memoize(normalize=True)
+    def calculate(operation, a, b=1):
+        return a + b if operation == "add" else a * b
+
+    calculate("add", 5, 3)
+    calculate("add", a=5, b=3)
+    calculate(b=3, a=5, operation="add")
+    print(calculate.cache_info().hits)  # Output: 2
+
+    # Example 3: a closure (outer_function from PY_Functions.py) and unhashable arguments
+    def outer_function(x):
+        def inner_function(values):
+            return [x + v for v in values]
+        return inner_function
+
+    add10 = memoize(typed=True)(outer_function(10))
+    print(add10([1, 2]), add10([1, 2]), add10([1.0, 2]))  # Output: [11, 12] [11, 12] [11.0, 12]
+    print(add10.cache_info().hits)      # Output: 1
+
+    # Example 4: eviction policies
+    lfu = memoize(policy="lfu", maxsize=2)(lambda x: x * 2)
+    lfu(1), lfu(1), lfu(2), lfu(3)      # 2 was used less often than 1, so it goes
+    print(list(lfu.cache._data))        # Output: [(1,), (3,)]
+    small = memoize(maxbytes=200)(lambda n: "x" * n)
+    small(50), small(50), small(100), small(10**6)
+    print(small.cache_info().evictions)  # Output: 1
+
+    # Example 5: async functions share one computation per key
+    calls = []
+
+    @memoize(policy="ttl", ttl=30)
+    async def fetch(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return {"id": user_id}
+
+    async def main():
+        return await asyncio.gather(*(fetch(7) for _ in range(5)))
+
+    print(asyncio.run(main())[0], len(calls))  # Output: {'id': 7} 1
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Memoization trades memory for time: each distinct call is computed once.
+# - The eviction policy decides what to forget when the cache is full.
+# - Keys must be built carefully: keyword order, defaults and types all matter.
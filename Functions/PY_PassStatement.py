@@ -56,4 +56,6 @@ try:
 except ValueError:
     pass  # Ignore the exception    
 finally:
-    print("Finally block executed")  # This will always print
\ No newline at end of file
+    print("Finally block executed")  # This will always print
+
+# PY_Probe.py uses this idea for tracing: disabled probe() calls are rewritten to `pass`, so they cost nothing.
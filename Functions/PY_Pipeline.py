@@ -0,0 +1,302 @@
+"""
+Stage-Parallel Pipelines with Backpressure
+
+A Stream (PY_Stream.py) runs all stages in one loop: element 1 goes through
+parse -> transform -> write, then element 2, and so on. If the stages have very
+different costs - say parse is fast, transform is CPU-heavy and write waits on
+disk - that single loop is always waiting on something, and other cores sit idle.
+
+A Pipeline gives every stage its own workers, like an assembly line:
+
+    source -> [queue] -> parse (1 thread) -> [queue] -> transform (4 processes) -> [queue] -> write (2 threads) -> results
+
+- Stages are connected by *bounded* queues (queue.Queue(maxsize)). If a stage
+  is slow, its input queue fills up and the stage before it blocks on put().
+  That is backpressure: fast stages slow down to the speed of the bottleneck
+  instead of piling up unlimited work in memory.
+- mode="thread"  runs the stage function in worker threads (good for I/O).
+  mode="process" runs it in a ProcessPoolExecutor (good for CPU-heavy Python);
+  the function and items must be picklable.
+- Every stage counts items in/out, busy time, current and maximum queue depth,
+  and how long its upstream was blocked by a full queue. stats() and report()
+  show them; bottleneck() names the stage with the highest utilisation.
+- ordered=True keeps the input order (items carry a sequence number and the
+  output is re-sorted); ordered=False yields results as soon as they are ready.
+"""
+
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+_DONE = object()       # end-of-stream marker, one per downstream worker
+_DROPPED = object()    # placeholder for a filtered-out item when ordered=True
+_POLL = 0.05           # seconds between checks of the stop flag while blocked
+
+
+class _Stage:
+    def __init__(self, kind, func, workers, mode, maxsize, name):
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.kind = kind
+        self.func = func
+        self.workers = workers
+        self.mode = mode
+        self.maxsize = maxsize
+        self.name = name or f"{kind}({getattr(func, '__name__', 'func')})"
+        self.reset()
+
+    def reset(self):
+        self.inbox = queue.Queue(self.maxsize)
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self.blocked_put_seconds = 0.0   # upstream time spent waiting for room in inbox
+        self.finished_workers = 0
+        self.lock = threading.Lock()
+        self.executor = None
+
+
+class Pipeline:
+    def __init__(self, source, maxsize=64, ordered=False):
+        self._source = source
+        self._maxsize = maxsize
+        self._ordered = ordered
+        self._stages = []
+        self._started = None
+        self._elapsed = None    # set when a run finishes; stats() works during a run too
+
+    def map(self, func, workers=1, mode="thread", maxsize=None, name=None):
+        self._stages.append(_Stage("map", func, workers, mode, maxsize or self._maxsize, name))
+        return self
+
+    def filter(self, predicate, workers=1, mode="thread", maxsize=None, name=None):
+        self._stages.append(_Stage("filter", predicate, workers, mode, maxsize or self._maxsize, name))
+        return self
+
+    # -- running ----------------------------------------------------------------
+    def run(self):
+        """Start all stages and yield the results (a generator)."""
+        if not self._stages:
+            raise ValueError("a pipeline needs at least one stage")
+        for stage in self._stages:
+            stage.reset()
+            if stage.mode == "process":
+                stage.executor = ProcessPoolExecutor(max_workers=stage.workers)
+        outbox = queue.Queue(self._maxsize)
+        stop = threading.Event()
+        errors = []
+        threads = [threading.Thread(target=self._feed, args=(stop, errors), daemon=True)]
+        for index, stage in enumerate(self._stages):
+            nxt = self._stages[index + 1] if index + 1 < len(self._stages) else None
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(target=self._work, args=(stage, nxt, outbox, stop, errors),
+                                                daemon=True))
+        self._started = time.perf_counter()
+        self._elapsed = None
+        for thread in threads:
+            thread.start()
+        try:
+            yield from self._drain(outbox, stop)
+        finally:
+            stop.set()  # also reached when the consumer stops early
+            for thread in threads:
+                thread.join()
+            for stage in self._stages:
+                if stage.executor is not None:
+                    stage.executor.shutdown(cancel_futures=True)
+            self._elapsed = time.perf_counter() - self._started
+        if errors:
+            raise errors[0]
+
+    def run_to_list(self):
+        return list(self.run())
+
+    def _put(self, target, item, stop, stage=None):
+        # Blocking put that still notices the stop flag. Waiting time is
+        # recorded on the receiving stage: it shows where backpressure happens.
+        start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                continue
+        if stage is not None:
+            waited = time.perf_counter() - start
+            depth = target.qsize()
+            with stage.lock:
+                stage.blocked_put_seconds += waited
+                if depth > stage.max_depth:
+                    stage.max_depth = depth
+        return not stop.is_set()
+
+    def _feed(self, stop, errors):
+        first = self._stages[0]
+        try:
+            for seq, item in enumerate(self._source):
+                if not self._put(first.inbox, (seq, item), stop, first):
+                    return
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+            return
+        for _ in range(first.workers):
+            self._put(first.inbox, _DONE, stop)
+
+    def _work(self, stage, nxt, outbox, stop, errors):
+        target = nxt.inbox if nxt is not None else outbox
+        try:
+            while not stop.is_set():
+                try:
+                    message = stage.inbox.get(timeout=_POLL)
+                except queue.Empty:
+                    continue
+                if message is _DONE:
+                    break
+                seq, item = message
+                if item is not _DROPPED:
+                    start = time.perf_counter()
+                    if stage.executor is not None:
+                        result = stage.executor.submit(stage.func, item).result()
+                    else:
+                        result = stage.func(item)
+                    busy = time.perf_counter() - start
+                    with stage.lock:
+                        stage.items_in += 1
+                        stage.busy_seconds += busy
+                    if stage.kind == "filter":
+                        if not result:
+                            if not self._ordered:
+                                continue
+                            item = _DROPPED
+                    else:
+                        item = result
+                    if item is not _DROPPED:
+                        with stage.lock:
+                            stage.items_out += 1
+                if not self._put(target, (seq, item), stop, nxt):
+                    return
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+            return
+        # The last worker of this stage to finish tells the next stage's workers.
+        with stage.lock:
+            stage.finished_workers += 1
+            last = stage.finished_workers == stage.workers
+        if last:
+            for _ in range(nxt.workers if nxt is not None else 1):
+                self._put(target, _DONE, stop)
+
+    def _drain(self, outbox, stop):
+        waiting = {}     # ordered mode: results that arrived before their turn
+        next_seq = 0
+        while not stop.is_set():
+            try:
+                message = outbox.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+            if message is _DONE:
+                return
+            seq, item = message
+            if not self._ordered:
+                yield item
+                continue
+            waiting[seq] = item
+            while next_seq in waiting:
+                item = waiting.pop(next_seq)
+                next_seq += 1
+                if item is not _DROPPED:
+                    yield item
+
+    # -- counters -----------------------------------------------------------------
+    def stats(self):
+        if self._started is None:
+            elapsed = 1e-9
+        elif self._elapsed is None:
+            elapsed = time.perf_counter() - self._started
+        else:
+            elapsed = self._elapsed
+        rows = []
+        for stage in self._stages:
+            rows.append({
+                "stage": stage.name,
+                "mode": stage.mode,
+                "workers": stage.workers,
+                "items_in": stage.items_in,
+                "items_out": stage.items_out,
+                "queue_depth": stage.inbox.qsize(),
+                "max_queue_depth": stage.max_depth,
+                "queue_capacity": stage.maxsize,
+                "blocked_put_seconds": stage.blocked_put_seconds,
+                "busy_seconds": stage.busy_seconds,
+                "utilisation": stage.busy_seconds / (elapsed * stage.workers),
+                "throughput": stage.items_in / elapsed,
+            })
+        return rows
+
+    def bottleneck(self):
+        rows = self.stats()
+        return max(rows, key=lambda row: row["utilisation"])["stage"] if rows else None
+
+    def report(self):
+        lines = [f"{'stage':<22} {'workers':>7} {'in':>8} {'out':>8} {'max q':>6} "
+                 f"{'util':>6} {'items/s':>9} {'upstream blocked (s)':>21}"]
+        for row in self.stats():
+            lines.append(
+                f"{row['stage']:<22} {row['workers']:>7} {row['items_in']:>8} {row['items_out']:>8} "
+                f"{row['max_queue_depth']:>6} {row['utilisation']:>6.0%} {row['throughput']:>9.0f} "
+                f"{row['blocked_put_seconds']:>21.3f}"
+            )
+        lines.append(f"bottleneck: {self.bottleneck()}")
+        return "\n".join(lines)
+
+
+# Example stage functions (module-level so mode="process" can pickle them)
+def parse(line):
+    return int(line)
+
+
+def transform(x):
+    total = 0
+    for i in range(2000):  # CPU-heavy step
+        total += (x * i) % 7
+    return total
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def slow_write(x):
+    time.sleep(0.001)  # stands in for a disk or network write
+    return x
+
+
+if __name__ == "__main__":
+    # Example 1: the map/filter examples from PY_Map.py and PY_Filter.py as stages
+    numbers = [1, 2, 3, 4, 5, 6]
+    pipe = Pipeline(numbers, ordered=True).map(lambda x: x**2, workers=2).filter(lambda x: x % 2 == 0)
+    print(pipe.run_to_list())                                   # Output: [4, 16, 36]
+
+    # Example 2: parse -> transform -> filter -> write with different worker counts
+    lines = (str(i) for i in range(400))
+    pipe = (Pipeline(lines, maxsize=16)
+            .map(parse, name="parse")
+            .map(transform, workers=2, mode="process", name="transform")
+            .filter(is_even, name="filter")
+            .map(slow_write, workers=4, name="write"))
+    results = pipe.run_to_list()
+    print(len(results) > 0)                                     # Output: True
+    print(pipe.report())
+
+# Summary:
+# - One worker pool per stage lets slow stages get more workers than fast ones.
+# - Bounded queues apply backpressure so memory stays flat.
+# - Per-stage counters show which stage is the bottleneck.
@@ -0,0 +1,224 @@
+"""
+Probe Points that Cost Nothing when Tracing is Off
+
+PY_PassStatement.py shows `pass`: a statement that does nothing. Tracing code
+should cost exactly that when it is switched off. A normal check does not:
+
+    def probe(name, **fields):
+        if TRACING:
+            ...
+
+Even when TRACING is False, every call still builds the keyword arguments,
+calls the function and tests the flag, which is about 100 ns in a hot loop.
+
+@probed goes further. When the decorated function is defined (at import time
+for module-level functions), it reads the function's source, replaces every
+statement of the form
+
+    probe("name", key=value, ...)
+
+with `pass`, and compiles that version too. While tracing is off the function
+runs the stripped code. `pass` compiles to nothing (or a NOP), so the loop body
+is identical to one that never had a probe: zero cost. The field expressions
+are not evaluated either, just like the expression of an `assert` under
+`python -O`.
+
+While tracing is on, the original code runs. probe() then appends a
+structured event (time, name, thread, fields) to a ring buffer: a deque with
+maxlen, so the newest events are kept and the oldest are dropped, and memory
+stays bounded.
+
+Switching: set_tracing(True/False) swaps the code object of every @probed
+function in place (func.__code__), so existing references see the change.
+The initial state comes from the environment variable PY_TRACE=1.
+
+Only statements that call this module's probe() are stripped: `probe(...)` or
+`PY_Probe.probe(...)` where the name really refers to it in the function's
+globals. A method such as sensor.probe() is left alone.
+
+probe() calls in functions without @probed, and in closures, still work; they
+just pay for the call and the flag check.
+"""
+
+import ast
+import inspect
+import os
+import sys
+import textwrap
+import threading
+import time
+from collections import deque, namedtuple
+
+
+Event = namedtuple("Event", "time_ns name thread fields")
+RING_SIZE = 10_000
+TRACING = os.environ.get("PY_TRACE") == "1"
+_ring = deque(maxlen=RING_SIZE)
+_probed = []   # (function, code with probes, code without probes)
+
+
+# Topic 1: The probe itself
+def probe(name, **fields):
+    """Record a structured event if tracing is on."""
+    if TRACING:
+        _ring.append(Event(time.perf_counter_ns(), name, threading.get_ident(), fields))
+
+
+def events(name=None):
+    """Return the buffered events (oldest first), optionally only those called name."""
+    snapshot = list(_ring)   # copying a deque is atomic, so writers can keep running
+    return snapshot if name is None else [event for event in snapshot if event.name == name]
+
+
+def clear():
+    _ring.clear()
+
+
+def set_ring_size(size):
+    global _ring
+    _ring = deque(_ring, maxlen=size)
+
+
+# Topic 2: Stripping probe calls from a function
+def _is_probe_call(node, namespace):
+    """True for `probe(...)` or `module.probe(...)` statements that call this module's probe()."""
+    if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)):
+        return False
+    func = node.value.func
+    if isinstance(func, ast.Name):
+        return namespace.get(func.id) is probe
+    if isinstance(func, ast.Attribute) and func.attr == "probe" and isinstance(func.value, ast.Name):
+        # e.g. PY_Probe.probe(...), but not sensor.probe() or conn.probe(timeout=1)
+        return getattr(namespace.get(func.value.id), "probe", None) is probe
+    return False
+
+
+class _StripProbes(ast.NodeTransformer):
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.count = 0
+
+    def visit_Expr(self, node):
+        if _is_probe_call(node, self.namespace):
+            self.count += 1
+            return ast.copy_location(ast.Pass(), node)
+        return node
+
+
+def probed(func):
+    """Compile func a second time without its probe() statements; run that one while tracing is off."""
+    if func.__code__.co_freevars:
+        return func   # a closure's code cannot be recompiled on its own; probes stay as calls
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):
+        return func   # no source (e.g. typed into the REPL)
+    module = ast.parse(source)
+    fdef = module.body[0]
+    if not isinstance(fdef, (ast.FunctionDef, ast.AsyncFunctionDef)) or fdef.name != func.__name__:
+        return func
+    fdef.decorator_list = []   # the decorators have already been applied to func
+    stripper = _StripProbes(func.__globals__)
+    stripper.visit(fdef)
+    if not stripper.count:
+        return func
+    ast.increment_lineno(module, func.__code__.co_firstlineno - 1)
+    namespace = {}
+    exec(compile(module, inspect.getsourcefile(func) or "<probed>", "exec"), func.__globals__, namespace)
+    stripped = namespace[func.__name__].__code__
+    _probed.append((func, func.__code__, stripped))
+    func.__probe_count__ = stripper.count
+    if not TRACING:
+        func.__code__ = stripped
+    return func
+
+
+def set_tracing(enabled):
+    """Turn tracing on or off, for probe() and for every @probed function."""
+    global TRACING
+    TRACING = bool(enabled)
+    for func, traced, stripped in _probed:
+        func.__code__ = traced if TRACING else stripped
+
+
+# Example functions
+def sum_with_pass(n):
+    total = 0
+    for i in range(n):
+        total += i
+        pass  # the placeholder from PY_PassStatement.py
+    return total
+
+
+@probed
+def sum_with_probe(n):
+    total = 0
+    for i in range(n):
+        total += i
+        probe("step", i=i, total=total)
+    return total
+
+
+def sum_with_checked_probe(n):
+    # The same code without @probed: every iteration calls probe(), which checks the flag.
+    total = 0
+    for i in range(n):
+        total += i
+        probe("step", i=i, total=total)
+    return total
+
+
+def benchmark(n=10**6, repeat=7):
+    def runs(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(n)
+            times.append(time.perf_counter() - start)
+        return sorted(times)
+
+    was_tracing = TRACING
+    set_tracing(False)
+    baseline = runs(sum_with_pass)
+    rows = [("loop with `pass`", baseline),
+            ("@probed, tracing off", runs(sum_with_probe)),
+            ("probe() call, tracing off", runs(sum_with_checked_probe))]
+    set_tracing(True)
+    rows.append(("@probed, tracing on", runs(sum_with_probe)))
+    set_tracing(was_tracing)
+    clear()
+    noise = baseline[len(baseline) // 2] - baseline[0]   # spread of the baseline's own runs
+    print(f"n={n}, best and median of {repeat} runs; baseline noise (median - best): {noise * 1e3:.2f} ms")
+    print(f"{'variant':<28} {'best ms':>8} {'median ms':>10} {'vs pass':>9}")
+    for label, times in rows:
+        best, median = times[0], times[len(times) // 2]
+        print(f"{label:<28} {best * 1e3:>8.2f} {median * 1e3:>10.2f} {(best - baseline[0]) * 1e3:>+8.2f}")
+
+
+if __name__ == "__main__":
+    # Example 1: with tracing off, the probe is gone from the bytecode
+    set_tracing(False)
+    print(sum_with_probe(10), sum_with_probe.__probe_count__)                  # Output: 45 1
+    print(sum_with_probe.__code__.co_code == sum_with_pass.__code__.co_code)   # Output: True
+    print("probe" in sum_with_probe.__code__.co_names)                         # Output: False
+
+    # Example 2: with tracing on, events go into the ring buffer
+    set_tracing(True)
+    sum_with_probe(5)
+    print([event.fields for event in events("step")][-2:])
+    # Output: [{'i': 3, 'total': 6}, {'i': 4, 'total': 10}]
+
+    # Example 3: the ring buffer keeps only the newest events
+    set_ring_size(3)
+    sum_with_probe(100)
+    print([event.fields["i"] for event in events()])                           # Output: [97, 98, 99]
+    set_tracing(False)
+    clear()
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - A runtime flag check still costs a call per probe; removing the call costs nothing.
+# - Rewriting the AST at definition time turns disabled probes into `pass`.
+# - A bounded ring buffer keeps tracing memory flat no matter how long it runs.
@@ -0,0 +1,241 @@
+"""
+Running (Streaming) Reductions with Checkpoints
+
+reduce() in PY_Reduce.py needs the whole list up front and returns one answer
+at the end. Many real inputs never end: log lines, sensor readings, messages
+from a queue. For those we want an object that
+
+- accepts items one at a time (add) or in batches (extend),
+- always knows the current aggregate (value), in O(1),
+- can write its state to a checkpoint file, so a restarted process continues
+  from there instead of reading the whole stream again.
+
+Built-in aggregators: Sum, Product, Min, Max, Count, Mean.
+RunningReduce(func, initializer) works with any two-argument function, like reduce().
+
+Every aggregator also counts the items it has seen (count). After a restart,
+that number tells you where to continue reading, e.g.
+itertools.islice(source, agg.count, None) for a source that can be replayed.
+
+Checkpoints are small JSON files, written to a temporary file and then moved
+into place with os.replace(). A crash halfway through a save therefore leaves
+the old checkpoint intact, never a half-written one.
+"""
+
+import json
+import math
+import os
+import tempfile
+from itertools import islice
+
+
+_MISSING = object()
+
+
+class RunningReduce:
+    """Fold items into one value as they arrive: value == reduce(func, items[, initializer])."""
+
+    kind = "reduce"
+
+    def __init__(self, func=None, initializer=_MISSING, checkpoint_path=None, checkpoint_every=None):
+        self.func = func
+        self.count = 0
+        self._value = initializer
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+
+    # -- feeding items --------------------------------------------------------------
+    def add(self, item):
+        self._value = item if self._value is _MISSING else self._combine(self._value, item)
+        self.count += 1
+        if self.checkpoint_every and self.count % self.checkpoint_every == 0:
+            self.save()
+        return self
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+        return self
+
+    def _combine(self, acc, item):
+        return self.func(acc, item)
+
+    # -- reading the aggregate ----------------------------------------------------------
+    @property
+    def value(self):
+        if self._value is _MISSING:
+            raise ValueError(f"{type(self).__name__} has no value yet (no items and no initializer)")
+        return self._value
+
+    def __repr__(self):
+        shown = "<empty>" if self._value is _MISSING else repr(self.value)
+        return f"{type(self).__name__}(value={shown}, count={self.count})"
+
+    # -- checkpoints -------------------------------------------------------------------
+    def state(self):
+        return {"kind": self.kind, "count": self.count,
+                "value": None if self._value is _MISSING else self._value,
+                "empty": self._value is _MISSING}
+
+    def load_state(self, state):
+        if state.get("kind") != self.kind:
+            raise ValueError(f"checkpoint is for {state.get('kind')!r}, not {self.kind!r}")
+        self.count = state["count"]
+        self._value = _MISSING if state["empty"] else state["value"]
+        return self
+
+    def save(self, path=None):
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("no checkpoint path given")
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(self.state(), file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)  # atomic: readers see the old or the new file
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def resume(cls, path, *args, **kwargs):
+        """Create an aggregator that continues from the checkpoint at path, if there is one."""
+        aggregator = cls(*args, checkpoint_path=path, **kwargs)
+        if os.path.exists(path):
+            with open(path) as file:
+                aggregator.load_state(json.load(file))
+        return aggregator
+
+
+# Topic 1: Built-in aggregators
+class Sum(RunningReduce):
+    """Sum of the items. Float sums use Neumaier's compensated summation."""
+
+    kind = "sum"
+
+    def __init__(self, **kwargs):
+        super().__init__(initializer=0, **kwargs)
+        self._compensation = 0.0  # low-order bits lost by float additions
+
+    def _combine(self, acc, item):
+        if isinstance(acc, float) or isinstance(item, float):
+            total = acc + item
+            if not math.isfinite(total):
+                return total   # inf or nan: the compensation would only turn it into nan
+            if abs(acc) >= abs(item):
+                self._compensation += (acc - total) + item
+            else:
+                self._compensation += (item - total) + acc
+            return total
+        return acc + item
+
+    @property
+    def value(self):
+        total = self._value
+        if not self._compensation or (isinstance(total, float) and not math.isfinite(total)):
+            return total   # like math.fsum, inf and nan are returned as they are
+        return total + self._compensation
+
+    def state(self):
+        return dict(super().state(), compensation=self._compensation)
+
+    def load_state(self, state):
+        super().load_state(state)
+        self._compensation = state.get("compensation", 0.0)
+        return self
+
+
+class Product(RunningReduce):
+    kind = "product"
+
+    def __init__(self, **kwargs):
+        super().__init__(initializer=1, **kwargs)
+
+    def _combine(self, acc, item):
+        return acc * item
+
+
+class Min(RunningReduce):
+    kind = "min"
+
+    def _combine(self, acc, item):
+        return item if item < acc else acc
+
+
+class Max(RunningReduce):
+    kind = "max"
+
+    def _combine(self, acc, item):
+        return item if item > acc else acc
+
+
+class Count(RunningReduce):
+    kind = "count"
+
+    def __init__(self, **kwargs):
+        super().__init__(initializer=0, **kwargs)
+
+    def _combine(self, acc, item):
+        return acc + 1
+
+
+class Mean(Sum):
+    """Arithmetic mean: a compensated sum divided by the number of items."""
+
+    kind = "mean"
+
+    @property
+    def value(self):
+        if self.count == 0:
+            raise ValueError("Mean has no value yet (no items)")
+        return super().value / self.count
+
+
+def load_checkpoint(path, func=None):
+    """Rebuild whichever aggregator wrote the checkpoint at path."""
+    with open(path) as file:
+        state = json.load(file)
+    classes = {cls.kind: cls for cls in (RunningReduce, Sum, Product, Min, Max, Count, Mean)}
+    if state["kind"] not in classes:
+        raise ValueError(f"unknown checkpoint kind {state['kind']!r}")
+    cls = classes[state["kind"]]
+    aggregator = cls(func=func) if cls is RunningReduce else cls()
+    aggregator.checkpoint_path = path
+    return aggregator.load_state(state)
+
+
+if __name__ == "__main__":
+    # Example 1: the reductions from PY_Reduce.py, one item at a time
+    total = Sum()
+    for number in [1, 2, 3, 4, 5]:
+        total.add(number)
+        print(total.value, end=" ")                    # Output: 1 3 6 10 15
+    print()
+    print(Max().extend([3, 1, 4, 1, 5, 9]).value)      # Output: 9
+    print(RunningReduce(lambda x, y: x + y).extend(['Hello', ' ', 'World', '!']).value)  # Output: Hello World!
+    print(Product().extend([1, 2, 3]).value, Mean().extend([1, 2, 3, 4]).value)          # Output: 6 2.5
+
+    # Example 2: compensated float sum
+    print(Sum().extend([0.1] * 10).value, sum([0.1] * 10))  # Output: 1.0 0.9999999999999999
+
+    # Example 3: checkpoint and resume
+    path = os.path.join(tempfile.gettempdir(), "running_mean.json")
+    if os.path.exists(path):
+        os.remove(path)
+    stream = range(1, 101)
+    mean = Mean.resume(path, checkpoint_every=25)
+    for x in islice(stream, 60):          # the process "crashes" after 60 items ...
+        mean.add(x)
+    restarted = Mean.resume(path)         # ... and a new one starts from the last checkpoint
+    print(restarted.count)                # Output: 50
+    restarted.extend(islice(stream, restarted.count, None))
+    print(restarted.value, restarted.count)  # Output: 50.5 100
+    print(load_checkpoint(path))          # Output: Mean(value=25.5, count=50)
+
+# Summary:
+# - A running aggregate updates in O(1) per item and can be read at any time.
+# - Saving a small state (value + count) lets a restarted process skip what it already saw.
+# - Write checkpoints to a temporary file and os.replace() it, so a crash never corrupts them.
@@ -0,0 +1,184 @@
+"""
+Stream: lazy, fused map/filter/reduce pipelines
+
+The examples in PY_Map.py, PY_Filter.py and PY_Reduce.py usually look like this:
+
+    squares = list(map(lambda x: x * x, numbers))        # list #1
+    evens   = list(filter(lambda x: x % 2 == 0, squares)) # list #2
+    total   = reduce(lambda x, y: x + y, evens)
+
+Every stage builds a complete list before the next stage starts. With 10^7
+numbers that is two lists of 10^7 int objects held in memory at once.
+
+A Stream only *records* the stages:
+
+    total = Stream(numbers).map(lambda x: x * x).filter(lambda x: x % 2 == 0).sum()
+
+Nothing runs until a terminal operation (sum, reduce, to_list, count, ...).
+Then all stages are fused into one pass: each element flows through every
+stage before the next element is read, so no intermediate list is ever built.
+
+How the fusion works: the recorded stages become a chain of the builtin lazy
+iterators (map, filter, itertools.islice, ...), and the terminal operation is a
+builtin that consumes an iterator (sum, max, functools.reduce, ...). These are
+all written in C, so the loop itself never runs Python bytecode; only your
+lambdas do.
+
+Streams are immutable: every stage returns a new Stream, so a partly built
+pipeline can be reused.
+"""
+
+import sys
+import time
+import tracemalloc
+from collections import deque
+from functools import reduce
+from itertools import dropwhile, islice, takewhile
+
+
+_MISSING = object()
+
+
+def _skip(iterator, n):
+    return islice(iterator, n, None)
+
+
+# Stage function -> Stream method name, used by __repr__
+_STAGE_NAMES = {map: "map", filter: "filter", islice: "take", _skip: "skip",
+                takewhile: "take_while", dropwhile: "skip_while"}
+
+
+class Stream:
+    def __init__(self, source, _stages=()):
+        self._source = source
+        self._stages = _stages
+
+    def _with(self, stage):
+        return Stream(self._source, self._stages + (stage,))
+
+    # -- stages (lazy) ----------------------------------------------------------
+    def map(self, func):
+        return self._with((map, func))
+
+    def filter(self, predicate=None):
+        return self._with((filter, predicate))
+
+    def take(self, n):
+        return self._with((islice, n))
+
+    def skip(self, n):
+        return self._with((_skip, n))
+
+    def take_while(self, predicate):
+        return self._with((takewhile, predicate))
+
+    def skip_while(self, predicate):
+        return self._with((dropwhile, predicate))
+
+    # -- fusion -----------------------------------------------------------------
+    def __iter__(self):
+        iterator = iter(self._source)
+        for stage, arg in self._stages:
+            if stage is map or stage is filter or stage is takewhile or stage is dropwhile:
+                iterator = stage(arg, iterator)
+            else:
+                iterator = stage(iterator, arg)
+        return iterator
+
+    # -- terminal operations (run the pipeline) -----------------------------------
+    def to_list(self):
+        return list(iter(self))
+
+    def reduce(self, func, initializer=_MISSING):
+        if initializer is _MISSING:
+            return reduce(func, iter(self))
+        return reduce(func, iter(self), initializer)
+
+    def sum(self, start=0):
+        return sum(iter(self), start)
+
+    def count(self):
+        return sum(1 for _ in iter(self))
+
+    def min(self, **kwargs):
+        return min(iter(self), **kwargs)
+
+    def max(self, **kwargs):
+        return max(iter(self), **kwargs)
+
+    def first(self, default=None):
+        return next(iter(self), default)
+
+    def for_each(self, func):
+        deque(map(func, iter(self)), maxlen=0)  # consume without storing anything
+
+    def __repr__(self):
+        names = [_STAGE_NAMES[stage] for stage, _ in self._stages]
+        return f"Stream({type(self._source).__name__}{''.join(f'.{n}()' for n in names)})"
+
+
+def eager_pipeline(n):
+    # The list-per-stage style from the tutorial files
+    squares = list(map(lambda x: x * x, range(n)))
+    evens = list(filter(lambda x: x % 2 == 0, squares))
+    return reduce(lambda x, y: x + y, evens)
+
+
+def stream_pipeline(n):
+    return Stream(range(n)).map(lambda x: x * x).filter(lambda x: x % 2 == 0).reduce(lambda x, y: x + y)
+
+
+def stream_sum_pipeline(n):
+    return Stream(range(n)).map(lambda x: x * x).filter(lambda x: x % 2 == 0).sum()
+
+
+def benchmark(n=10**7):
+    print(f"n={n}")
+    print(f"{'pipeline':<34} {'seconds':>9} {'peak MiB':>10}")
+    for label, run in (
+        ("list(map) -> list(filter) -> reduce", eager_pipeline),
+        ("Stream ... .reduce()", stream_pipeline),
+        ("Stream ... .sum()", stream_sum_pipeline),
+    ):
+        start = time.perf_counter()
+        result = run(n)
+        elapsed = time.perf_counter() - start
+        # tracemalloc slows Python down a lot, so memory is measured in a separate run.
+        tracemalloc.start()
+        run(n)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<34} {elapsed:>9.3f} {peak / 2**20:>10.2f}")
+    return result
+
+
+if __name__ == "__main__":
+    numbers = [1, 2, 3, 4, 5, 6]
+
+    # Example 1: map + filter + reduce in one pass
+    print(Stream(numbers).map(lambda x: x * x).filter(lambda x: x % 2 == 0).to_list())  # Output: [4, 16, 36]
+    print(Stream(numbers).map(lambda x: x * x).filter(lambda x: x % 2 == 0).sum())      # Output: 56
+
+    # Example 2: reduce() with an initializer, as in PY_Reduce.py Example 4
+    print(Stream([1, 2, 3]).reduce(lambda x, y: x * y, 10))         # Output: 60
+
+    # Example 3: strings
+    print(Stream(['apple', 'banana', 'cherry', 'date']).filter(lambda w: len(w) > 4).map(str.upper).to_list())
+    # Output: ['APPLE', 'BANANA', 'CHERRY']
+
+    # Example 4: laziness - an endless source works as long as we stop early
+    from itertools import count
+    print(Stream(count()).map(lambda x: x * 3).skip(2).take(3).to_list())  # Output: [6, 9, 12]
+
+    # Example 5: a pipeline is reusable because stages are recorded, not run
+    evens = Stream(range(10)).filter(lambda x: x % 2 == 0)
+    print(evens.count(), evens.max())                                # Output: 5 8
+    print(evens)                                                     # Output: Stream(range.filter())
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Building a list after every stage costs memory and time.
+# - Recording stages and running them at the end fuses them into a single pass.
+# - Chaining the builtin lazy iterators keeps that single pass inside C code.
@@ -0,0 +1,392 @@
+"""
+Vectorizing Simple Lambdas with NumPy
+
+    map(lambda x: x**2, numbers)
+    filter(lambda x: x % 2 == 0, numbers)
+
+Each element costs one Python function call: load x, look up the operator,
+create a new int object, return it. With NumPy the same arithmetic runs as one
+C loop over a whole array (a "vectorized" ufunc expression), often 10-100x faster.
+
+vmap() and vfilter() take an ordinary lambda and try to translate it:
+
+1. Read the lambda's bytecode with the dis module and rebuild its expression
+   as a small tree: arguments, constants, + - * / // % ** & | ^ << >>,
+   unary minus / not / ~, and single comparisons (< <= == != > >=).
+2. If the input is a list of numbers, an array.array or a NumPy array, evaluate
+   that tree once on whole arrays.
+3. Otherwise - NumPy not installed, a function call or a global name inside the
+   lambda, mixed or non-numeric data, a possible int64 overflow, division by
+   zero - quietly fall back to the builtin map()/filter().
+
+So the results always match the builtin versions; only the speed changes.
+
+Where the speed comes from: for a plain list, converting to an array and back
+costs about as much as a cheap lambda, so the gain is small. The big wins are
+array.array and NumPy inputs (no conversion) and longer expressions.
+
+Output types (the same whether the fast path or the fallback ran):
+- vmap():    a list, or a NumPy array if the first input was a NumPy array
+- vfilter(): the same kind of container that came in
+
+Lists of bools stay with the builtins: NumPy would compute with them as
+0 and 1, and map(lambda x: x, [True]) must give [True], not [1]. When a NumPy
+input falls back, its elements are read with tolist() as Python numbers, so
+x**40 gives the exact Python int instead of a wrapped-around int64.
+"""
+
+import dis
+import operator
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; everything falls back to map()/filter()
+    np = None
+
+
+# The operators, as_arrays() and run_tree() are shared with PY_MaskFilter.py.
+BINARY_OPS = {
+    "+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv,
+    "//": operator.floordiv, "%": operator.mod, "**": operator.pow,
+    "&": operator.and_, "|": operator.or_, "^": operator.xor,
+    "<<": operator.lshift, ">>": operator.rshift,
+}
+# Opcode names used before Python 3.11 introduced BINARY_OP
+_OLD_BINARY = {
+    "BINARY_ADD": "+", "BINARY_SUBTRACT": "-", "BINARY_MULTIPLY": "*",
+    "BINARY_TRUE_DIVIDE": "/", "BINARY_FLOOR_DIVIDE": "//", "BINARY_MODULO": "%",
+    "BINARY_POWER": "**", "BINARY_AND": "&", "BINARY_OR": "|", "BINARY_XOR": "^",
+    "BINARY_LSHIFT": "<<", "BINARY_RSHIFT": ">>",
+}
+COMPARE_OPS = {
+    "<": operator.lt, "<=": operator.le, "==": operator.eq,
+    "!=": operator.ne, ">": operator.gt, ">=": operator.ge,
+}
+
+
+class Unsupported(Exception):
+    """The lambda or the data cannot be vectorized; use the builtin instead."""
+
+
+# Topic 1: From bytecode to an expression tree
+# Nodes are tuples: ("arg", index) ("const", value) ("op", symbol, left, right)
+#                   ("cmp", symbol, left, right) ("unary", symbol, operand)
+def translate(func):
+    """Return the expression tree of a simple numeric lambda, or None."""
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+    if code in _cache:
+        return _cache[code]
+    try:
+        tree = _build_tree(code)
+    except Unsupported:
+        tree = None
+    _cache[code] = tree
+    return tree
+
+
+_cache = {}
+
+
+def _build_tree(code):
+    if code.co_flags & 0x0C or code.co_kwonlyargcount:  # *args / **kwargs / keyword-only
+        raise Unsupported
+    params = code.co_varnames[:code.co_argcount]
+    stack = []
+    for ins in dis.get_instructions(code):
+        name = ins.opname
+        if name in ("RESUME", "NOP", "CACHE", "PRECALL"):
+            continue
+        if name.startswith("LOAD_FAST"):
+            names = ins.argval if isinstance(ins.argval, tuple) else (ins.argval,)
+            for var in names:
+                if var not in params:
+                    raise Unsupported
+                stack.append(("arg", params.index(var)))
+        elif name in ("LOAD_CONST", "LOAD_SMALL_INT"):
+            if type(ins.argval) not in (int, float, bool):
+                raise Unsupported
+            stack.append(("const", ins.argval))
+        elif name == "BINARY_OP" or name in _OLD_BINARY:
+            symbol = _OLD_BINARY.get(name) or ins.argrepr
+            if symbol not in BINARY_OPS:
+                raise Unsupported
+            right, left = stack.pop(), stack.pop()
+            stack.append(("op", symbol, left, right))
+        elif name == "COMPARE_OP":
+            symbol = ins.argrepr.replace("bool(", "").rstrip(")")
+            if symbol not in COMPARE_OPS:
+                raise Unsupported
+            right, left = stack.pop(), stack.pop()
+            stack.append(("cmp", symbol, left, right))
+        elif name in ("UNARY_NEGATIVE", "UNARY_NOT", "UNARY_INVERT"):
+            stack.append(("unary", name[6:].lower(), stack.pop()))
+        elif name == "TO_BOOL":
+            continue
+        elif name == "RETURN_VALUE" and len(stack) == 1:
+            return stack[0]
+        elif name == "RETURN_CONST":
+            raise Unsupported  # a constant lambda; nothing worth vectorizing
+        else:
+            raise Unsupported  # calls, globals, attribute access, jumps (and/or), ...
+    raise Unsupported
+
+
+# Topic 2: Evaluating the tree on arrays
+# NumPy integers are fixed-size (int64) and silently wrap around on overflow,
+# while Python ints never overflow. So before running an expression on int64
+# arrays we compute the smallest and largest value every step could produce
+# (interval arithmetic on the inputs' min and max) and refuse if any step could
+# leave the int64 range.
+_INT64_MIN, _INT64_MAX = -2**63, 2**63 - 1
+
+
+def _bounds(tree, ranges):
+    """Return (lo, hi) for an integer-valued node, or None for a float-valued one."""
+    kind = tree[0]
+    if kind == "arg":
+        return ranges[tree[1]]
+    if kind == "const":
+        return None if isinstance(tree[1], float) else (int(tree[1]), int(tree[1]))
+    if kind == "cmp":
+        left, right = _bounds(tree[2], ranges), _bounds(tree[3], ranges)
+        if (left is None) != (right is None) and max(map(abs, left or right)) > 2**53:
+            raise Unsupported  # Python compares int with float exactly; NumPy rounds the int to float
+        return (0, 1)
+    if kind == "unary":
+        inner = _bounds(tree[2], ranges)
+        if tree[1] == "not":
+            return (0, 1)
+        if inner is None:
+            if tree[1] == "invert":
+                raise Unsupported  # ~ on a float is a TypeError
+            return None
+        lo, hi = inner
+        result = (-hi, -lo) if tree[1] == "negative" else (-hi - 1, -lo - 1)
+        return _checked(result)
+    symbol, left, right = tree[1], _bounds(tree[2], ranges), _bounds(tree[3], ranges)
+    if symbol == "/":
+        if left is not None and right is not None and max(map(abs, left + right)) > 2**53:
+            raise Unsupported  # Python divides big ints exactly; NumPy converts them to float first
+        return None
+    if left is None or right is None:
+        if symbol in ("&", "|", "^", "<<", ">>"):
+            raise Unsupported  # bit operations on floats are a TypeError
+        if symbol == "**":
+            raise Unsupported  # NumPy's float power can differ from Python's in the last bit
+        return None
+    (a, b), (c, d) = left, right
+    if symbol == "+":
+        return _checked((a + c, b + d))
+    if symbol == "-":
+        return _checked((a - d, b - c))
+    if symbol == "*":
+        products = (a * c, a * d, b * c, b * d)
+        return _checked((min(products), max(products)))
+    if symbol == "**":
+        if c < 0 or d > 64:
+            raise Unsupported  # negative powers give floats in Python; big ones overflow
+        big = max(abs(a), abs(b)) ** d if d else 1
+        return _checked((-big if a < 0 else 0, big))
+    if symbol in ("//", "%"):
+        if c <= 0 <= d:
+            raise Unsupported  # a zero divisor raises ZeroDivisionError in Python
+        if symbol == "%":
+            big = max(abs(c), abs(d))
+            return (-big, big)
+        return _checked((-max(abs(a), abs(b)) - 1, max(abs(a), abs(b)) + 1))
+    if symbol in ("<<", ">>"):
+        if c < 0:
+            raise Unsupported  # negative shift count raises ValueError
+        if symbol == ">>":
+            return (min(a, 0), max(b, 0))
+        return _checked((min(a, 0) << d, max(b, 0) << d))
+    bits = max(abs(a), abs(b), abs(c), abs(d)).bit_length() + 1  # & | ^
+    return (-(1 << bits), 1 << bits)
+
+
+def _checked(interval):
+    if interval[0] < _INT64_MIN or interval[1] > _INT64_MAX:
+        raise Unsupported  # the exact Python result would not fit in int64
+    return interval
+
+
+def _evaluate(tree, arrays):
+    kind = tree[0]
+    if kind == "arg":
+        return arrays[tree[1]]
+    if kind == "const":
+        return tree[1]
+    if kind == "unary":
+        value = _evaluate(tree[2], arrays)
+        if tree[1] == "negative":
+            return -value
+        if tree[1] == "not":
+            return np.logical_not(value)
+        return ~value
+    left, right = _evaluate(tree[2], arrays), _evaluate(tree[3], arrays)
+    if kind == "cmp":
+        return COMPARE_OPS[tree[1]](left, right)
+    return BINARY_OPS[tree[1]](left, right)
+
+
+def as_arrays(iterables):
+    """Convert inputs to 1-D NumPy arrays without copying when possible, or raise Unsupported."""
+    if np is None:
+        raise Unsupported
+    arrays = []
+    for data in iterables:
+        if isinstance(data, np.ndarray):
+            arr = data
+        elif isinstance(data, array):
+            if data.typecode in ("u", "w"):
+                raise Unsupported
+            arr = np.frombuffer(data, dtype=data.typecode) if len(data) else np.array([], data.typecode)
+        elif isinstance(data, (list, tuple)):
+            kinds = set(map(type, data))
+            try:
+                if kinds == {int}:   # not bool: True must not come back as 1
+                    arr = np.array(data, dtype=np.int64)
+                elif kinds == {float}:
+                    arr = np.array(data, dtype=np.float64)
+                else:
+                    raise Unsupported  # empty, mixed or non-numeric data
+            except OverflowError:
+                raise Unsupported from None  # ints too big for int64
+        else:
+            raise Unsupported  # generators etc.: we would have to consume them
+        if arr.dtype.kind not in "iuf" or arr.ndim != 1:
+            raise Unsupported
+        arrays.append(arr)
+    size = min(len(a) for a in arrays)
+    return [a[:size] for a in arrays]
+
+
+def run_tree(tree, arrays):
+    """Evaluate an expression tree on arrays exactly as Python would, or raise Unsupported."""
+    # Python works with int and float (a C double), so compute in int64/float64
+    # even if the input array holds int8 or float32 values.
+    ranges, work = [], []
+    for arr in arrays:
+        if arr.dtype.kind == "f":
+            ranges.append(None)
+            work.append(arr.astype(np.float64, copy=False))
+            continue
+        lo, hi = (int(arr.min()), int(arr.max())) if len(arr) else (0, 0)
+        ranges.append(_checked((lo, hi)))
+        work.append(arr.astype(np.int64, copy=False))
+    _bounds(tree, ranges)
+    with np.errstate(all="raise"):
+        try:
+            result = _evaluate(tree, work)
+        except (FloatingPointError, ValueError, TypeError, OverflowError, ZeroDivisionError) as exc:
+            raise Unsupported from exc
+    if np.ndim(result) == 0:
+        result = np.full(len(work[0]), result)
+    return result
+
+
+# Topic 3: Drop-in map() and filter()
+def vmap(func, *iterables):
+    """Like list(map(func, *iterables)), vectorized when possible."""
+    if not iterables:
+        raise TypeError("vmap() must have at least two arguments.")
+    tree = translate(func)
+    if tree is not None:
+        try:
+            arrays = as_arrays(iterables)
+            if len(arrays) == func.__code__.co_argcount:
+                result = run_tree(tree, arrays)
+                return result if isinstance(iterables[0], np.ndarray) else result.tolist()
+        except Unsupported:
+            pass
+    if np is not None and isinstance(iterables[0], np.ndarray):
+        # tolist() gives Python ints and floats, so nothing wraps around like NumPy int64 scalars
+        columns = [data.tolist() if isinstance(data, np.ndarray) else data for data in iterables]
+        return _to_ndarray(list(map(func, *columns)))
+    return list(map(func, *iterables))
+
+
+def _to_ndarray(values):
+    try:
+        return np.array(values)   # ints beyond int64 become uint64 or object, so they stay exact
+    except ValueError:            # ragged results, e.g. tuples of different lengths
+        out = np.empty(len(values), dtype=object)
+        out[:] = values
+        return out
+
+
+def vfilter(func, iterable):
+    """Like filter(func, iterable), vectorized when possible; keeps the container type."""
+    tree = translate(func)
+    if tree is not None and func.__code__.co_argcount == 1:
+        try:
+            (arr,) = as_arrays([iterable])
+            mask = run_tree(tree, [arr])
+            if mask.dtype != np.bool_:
+                mask = mask != 0  # filter() keeps truthy results
+            selected = arr[mask]
+            if isinstance(iterable, np.ndarray):
+                return selected
+            if isinstance(iterable, array):
+                return array(iterable.typecode, selected.tobytes())
+            return type(iterable)(selected.tolist())
+        except Unsupported:
+            pass
+    if np is not None and isinstance(iterable, np.ndarray):
+        keep = [bool(func(value)) for value in iterable.tolist()]
+        return iterable[np.array(keep, dtype=bool)] if keep else iterable[:0]
+    result = filter(func, iterable)
+    if isinstance(iterable, array):
+        return array(iterable.typecode, result)
+    return type(iterable)(result) if isinstance(iterable, (list, tuple)) else list(result)
+
+
+def benchmark(n=10**6):
+    inputs = [("list", list(range(n))), ("array('q')", array("q", range(n)))]
+    if np is not None:
+        inputs.append(("ndarray", np.arange(n)))
+    cases = [
+        ("x**2", lambda d: list(map(lambda x: x**2, d)), lambda d: vmap(lambda x: x**2, d)),
+        ("x + y", lambda d: list(map(lambda x, y: x + y, d, d)), lambda d: vmap(lambda x, y: x + y, d, d)),
+        ("x % 2 == 0", lambda d: list(filter(lambda x: x % 2 == 0, d)),
+         lambda d: vfilter(lambda x: x % 2 == 0, d)),
+        ("(3*x + 1) % 7 - x // 5", lambda d: list(map(lambda x: (3*x + 1) % 7 - x // 5, d)),
+         lambda d: vmap(lambda x: (3*x + 1) % 7 - x // 5, d)),
+    ]
+    print(f"n={n}")
+    for label, builtin, vectorized in cases:
+        for kind, data in inputs:
+            timings = []
+            for run in (builtin, vectorized):
+                start = time.perf_counter()
+                run(data)
+                timings.append(time.perf_counter() - start)
+            print(f"{label:<24} {kind:<11} builtin {timings[0]:.3f} s   vectorized {timings[1]:.3f} s")
+
+
+if __name__ == "__main__":
+    # Example 1: The lambdas from PY_Map.py, PY_Filter.py and PY_List.py
+    numbers = [1, 2, 3, 4, 5]
+    print(vmap(lambda x: x**2, numbers))                     # Output: [1, 4, 9, 16, 25]
+    print(vmap(lambda x, y: x + y, [1, 2, 3], [4, 5, 6]))    # Output: [5, 7, 9]
+    print(vfilter(lambda x: x % 2 == 0, [1, 2, 3, 4, 5, 6]))  # Output: [2, 4, 6]
+    print(vfilter(lambda x: x > 0, array('i', [-2, -1, 0, 1, 2])))  # Output: array('i', [1, 2])
+
+    # Example 2: Things that fall back to the builtin (same results, no speedup)
+    print(vmap(lambda s: s.upper(), ['hello', 'world']))     # Output: ['HELLO', 'WORLD']
+    print(vmap(lambda x: x**40, [3]))                        # Output: [12157665459056928801] (too big for int64)
+    print(translate(lambda x: x % 2 == 0) is not None)       # Output: True (translating does not need NumPy)
+    print(vfilter(lambda x: x, [True, False, True]))         # Output: [True, True] (bools are not made ints)
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - A lambda's bytecode is a tiny stack program that can be turned back into an expression.
+# - NumPy evaluates that expression over a whole array in C.
+# - Checking types and int64 range first keeps the results identical to map()/filter().
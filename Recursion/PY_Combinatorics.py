@@ -0,0 +1,229 @@
+"""
+Factorial Tables for Combinatorics
+
+Binomial coefficients and permutations are built from factorials:
+
+    nCr = n! / (r! * (n-r)!)        nPr = n! / (n-r)!
+
+Calling factorial() for every query recomputes n! from scratch each time. If we
+keep a table where fact[i] = i!, each new entry costs one multiplication:
+
+    fact[i] = fact[i-1] * i
+
+and every later query is just a few table lookups.
+
+Two tables are shown here:
+
+1. FactorialTable - exact integers, stored in a list (Python ints can be any size).
+2. ModFactorialTable - everything modulo a prime p, stored in array.array('Q')
+   (8 bytes per entry instead of a full int object). Division is not allowed
+   in modular arithmetic, so we also keep inverse factorials:
+
+       inv_fact[i] = (i!)^-1 mod p      and      nCr = fact[n] * inv_fact[r] * inv_fact[n-r] mod p
+
+   Only one modular inverse is computed per growth step (with pow(x, -1, p));
+   the rest follow from inv_fact[i-1] = inv_fact[i] * i.
+
+Both tables grow lazily: they extend only when a query needs a bigger n, and
+they grow by a fixed fraction each time (x1.25 exact, x2 modular), so the total
+work stays linear (amortized O(1) per entry). After that, every query is O(1)
+table lookups.
+
+Note: entry i of the exact table has about i*log2(i) bits, so its memory grows
+roughly quadratically. Use it for n up to a few thousand; for bigger n work
+modulo a prime.
+"""
+
+import math
+from array import array
+
+
+# Topic 1: Exact table
+class FactorialTable:
+    def __init__(self):
+        self._fact = [1]
+
+    def __len__(self):
+        return len(self._fact)
+
+    def reserve(self, n):
+        """Make sure fact[0..n] exists."""
+        table = self._fact
+        if n < len(table):
+            return
+        # Growing by a fixed fraction keeps the cost amortized O(1) without
+        # doubling an already large table of huge integers.
+        target = max(n, len(table) + len(table) // 4)
+        value = table[-1]
+        for i in range(len(table), target + 1):
+            value *= i
+            table.append(value)
+
+    def factorial(self, n):
+        _check(n, 0)
+        self.reserve(n)
+        return self._fact[n]
+
+    def comb(self, n, r):
+        _check(n, r)
+        if r > n:
+            return 0
+        self.reserve(n)
+        fact = self._fact
+        return fact[n] // (fact[r] * fact[n - r])
+
+    def perm(self, n, r):
+        _check(n, r)
+        if r > n:
+            return 0
+        self.reserve(n)
+        return self._fact[n] // self._fact[n - r]
+
+    # Batch API: grow once for the largest n, then answer every query
+    def comb_many(self, queries):
+        queries = list(queries)
+        self.reserve(max((n for n, _ in queries), default=0))
+        return [self.comb(n, r) for n, r in queries]
+
+    def perm_many(self, queries):
+        queries = list(queries)
+        self.reserve(max((n for n, _ in queries), default=0))
+        return [self.perm(n, r) for n, r in queries]
+
+
+# Topic 2: Table modulo a prime
+def _is_prime(n):
+    """Deterministic Miller-Rabin test; these bases are enough for every n below 2**64."""
+    if n < 2:
+        return False
+    bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+    for q in bases:
+        if n % q == 0:
+            return n == q
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+class ModFactorialTable:
+    def __init__(self, modulus=10**9 + 7):
+        # Inverses (and Lucas' theorem) need a prime; a composite modulus would give wrong answers.
+        if not (2 <= modulus < 1 << 63 and _is_prime(modulus)):
+            raise ValueError("modulus must be a prime between 2 and 2**63")
+        self.modulus = modulus
+        self._fact = array("Q", [1])
+        self._inv_fact = array("Q", [1])
+
+    def __len__(self):
+        return len(self._fact)
+
+    def reserve(self, n):
+        p = self.modulus
+        n = min(n, p - 1)  # p! is 0 mod p, so no entry past p-1 is useful
+        fact, inv_fact = self._fact, self._inv_fact
+        old = len(fact)
+        if n < old:
+            return
+        target = min(max(n, 2 * old), p - 1)
+        value = fact[-1]
+        for i in range(old, target + 1):
+            value = value * i % p
+            fact.append(value)
+        # One modular inverse for the new top entry, then walk back down.
+        new_inv = [0] * (target + 1 - old)
+        value = pow(fact[target], -1, p)
+        for i in range(target, old - 1, -1):
+            new_inv[i - old] = value
+            value = value * i % p
+        inv_fact.extend(new_inv)
+
+    def factorial(self, n):
+        _check(n, 0)
+        if n >= self.modulus:
+            return 0
+        self.reserve(n)
+        return self._fact[n]
+
+    def comb(self, n, r):
+        _check(n, r)
+        if r > n:
+            return 0
+        p = self.modulus
+        if n >= p:
+            # Lucas' theorem: work digit by digit in base p.
+            result = 1
+            while n and result:
+                result = result * self.comb(n % p, r % p) % p
+                n //= p
+                r //= p
+            return result
+        self.reserve(n)
+        return self._fact[n] * self._inv_fact[r] % p * self._inv_fact[n - r] % p
+
+    def perm(self, n, r):
+        _check(n, r)
+        if r > n:
+            return 0
+        p = self.modulus
+        if r >= p or n // p != (n - r) // p:
+            return 0  # the product n * (n-1) * ... * (n-r+1) contains a multiple of p
+        # All factors lie between two multiples of p, so modulo p they are (n-r)%p+1 .. n%p.
+        self.reserve(n % p)
+        return self._fact[n % p] * self._inv_fact[(n - r) % p] % p
+
+    # Only n < p needs table entries up to n; larger n only looks up digits below p.
+    def _largest_entry(self, queries):
+        p = self.modulus
+        return max((n if n < p else n % p for n, _ in queries), default=0)
+
+    def comb_many(self, queries):
+        queries = list(queries)
+        self.reserve(self._largest_entry(queries))
+        return [self.comb(n, r) for n, r in queries]
+
+    def perm_many(self, queries):
+        queries = list(queries)
+        self.reserve(self._largest_entry(queries))
+        return [self.perm(n, r) for n, r in queries]
+
+
+def _check(n, r):
+    if not isinstance(n, int) or not isinstance(r, int) or n < 0 or r < 0:
+        raise ValueError("n and r must be non-negative integers")
+
+
+if __name__ == "__main__":
+    # Example 1: Exact combinatorics
+    table = FactorialTable()
+    print(table.factorial(5))                      # Output: 120
+    print(table.comb(5, 2))                        # Output: 10
+    print(table.perm(5, 2))                        # Output: 20
+    print(table.comb_many([(10, 3), (52, 5)]))     # Output: [120, 2598960]
+    print(table.comb(100, 50) == math.comb(100, 50))  # Output: True
+
+    # Example 2: Modulo a prime
+    mod_table = ModFactorialTable(10**9 + 7)
+    print(mod_table.comb(10**6, 500000))           # Output: 996692777
+    print(mod_table.perm_many([(5, 2), (10, 10)])) # Output: [20, 3628800]
+    small = ModFactorialTable(7)
+    print(small.comb(10, 3), math.comb(10, 3) % 7) # Output: 1 1  (uses Lucas' theorem)
+    try:
+        ModFactorialTable(10**9)
+    except ValueError as error:
+        print(error)                               # Output: modulus must be a prime between 2 and 2**63
+
+# Summary:
+# - Precomputing factorials turns each nCr / nPr query into a few lookups.
+# - Growing the table by a fixed fraction (x1.25 exact, x2 modular) keeps the total precomputation linear.
+# - Modulo a prime, inverse factorials replace division.
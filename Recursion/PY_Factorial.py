@@ -0,0 +1,190 @@
+"""
+Fast Factorials: Product Trees and Prime Swing
+
+The factorial in PY_recursoin.py (and Example 11 in Functions/PY_Functions.py) does
+
+    n * factorial(n-1)
+
+which multiplies one huge number by one small number, n times. Once the running
+product has thousands of digits, each step costs time proportional to its size,
+so the whole computation is roughly quadratic in the number of digits.
+
+Python's big-int multiplication switches to Karatsuba when *both* operands are
+large, and Karatsuba is much cheaper than schoolbook multiplication for balanced
+operands. So the trick is to multiply numbers of similar size:
+
+1. Product tree (binary splitting):
+       1*2*...*8 = ((1*2)*(3*4)) * ((5*6)*(7*8))
+   Every level of the tree multiplies numbers of about the same size.
+
+2. Prime swing (Peter Luschny's algorithm):
+       n! = ((n//2)!)**2 * swing(n)
+   swing(n) = n! / ((n//2)!)**2 is built from primes only, each raised to a
+   small power, so there is much less to multiply. Squaring is also cheaper
+   than a general multiplication.
+
+Note: math.factorial in CPython already uses a divide-and-conquer algorithm in C.
+It is included in the benchmark as the reference point.
+
+Run `python PY_Factorial.py --bench` to compare the methods.
+"""
+
+import math
+import sys
+import time
+
+
+# Topic 1: Product trees
+def range_product(lo, hi):
+    """Return lo * (lo+1) * ... * (hi-1), multiplied as a balanced tree."""
+    if hi - lo <= 8:
+        # Small leaves: a plain loop is faster than more splitting.
+        result = 1
+        for i in range(lo, hi):
+            result *= i
+        return result
+    mid = (lo + hi) // 2
+    return range_product(lo, mid) * range_product(mid, hi)
+
+
+def product_tree(values):
+    """Multiply a list of numbers by pairing neighbours level by level."""
+    values = list(values)
+    if not values:
+        return 1
+    while len(values) > 1:
+        paired = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+    return values[0]
+
+
+# Example 1: Binary-splitting factorial
+def binary_split_factorial(n):
+    _check(n)
+    return range_product(2, n + 1)
+
+
+# Topic 2: Prime swing
+def primes_up_to(n):
+    """Sieve of Eratosthenes, returns a list of primes <= n."""
+    if n < 2:
+        return []
+    sieve = bytearray([1]) * (n + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, math.isqrt(n) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, n + 1, p)))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+
+def _swing(n, primes):
+    # The exponent of p in swing(n) is the number of k >= 1 with (n // p**k) odd.
+    factors = []
+    root = math.isqrt(n)
+    for p in primes:
+        if p > n:
+            break
+        if p > n // 2:
+            factors.append(p)  # primes in (n/2, n] appear exactly once
+        elif p > root:
+            if (n // p) & 1:
+                factors.append(p)
+        else:
+            q, power = n, 1
+            while q:
+                q //= p
+                if q & 1:
+                    power *= p
+            if power > 1:
+                factors.append(power)
+    return product_tree(factors)
+
+
+# Example 2: Prime-swing factorial
+def prime_swing_factorial(n):
+    _check(n)
+    primes = primes_up_to(n)
+
+    def rec(m):
+        if m < 2:
+            return 1
+        return rec(m // 2) ** 2 * _swing(m, primes)
+
+    return rec(n)  # recursion depth is only log2(n)
+
+
+def factorial(n):
+    """Fast factorial: a product tree for small n, prime swing above that."""
+    _check(n)
+    if n < 2000:
+        return binary_split_factorial(n)
+    return prime_swing_factorial(n)
+
+
+def _check(n):
+    if not isinstance(n, int) or n < 0:
+        raise ValueError("factorial() not defined for negative or non-integer values")
+
+
+# The current functions, kept here so the benchmark can call them
+def recursive_factorial(n):
+    if n == 0:
+        return 1
+    else:
+        return n * recursive_factorial(n-1)
+
+
+def linear_factorial(n):
+    # Same multiplication order as recursive_factorial, without the recursion limit.
+    result = 1
+    for i in range(1, n + 1):
+        result *= i
+    return result
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6), linear_limit=2 * 10**5, recursive_limit=10**4):
+    """Print timings for every method; slow methods are skipped above their limit."""
+    methods = [
+        ("recursive_factorial", recursive_factorial, recursive_limit),
+        ("linear_factorial", linear_factorial, linear_limit),
+        ("binary_split_factorial", binary_split_factorial, None),
+        ("prime_swing_factorial", prime_swing_factorial, None),
+        ("math.factorial", math.factorial, None),
+    ]
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old_limit, recursive_limit + 100))
+    try:
+        print(f"{'n':>9} {'method':<24} {'seconds':>10}")
+        for n in sizes:
+            expected = math.factorial(n)
+            for name, func, limit in methods:
+                if limit is not None and n > limit:
+                    print(f"{n:>9} {name:<24} {'skipped':>10}")
+                    continue
+                start = time.perf_counter()
+                result = func(n)
+                elapsed = time.perf_counter() - start
+                assert result == expected, name
+                print(f"{n:>9} {name:<24} {elapsed:>10.4f}")
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+
+if __name__ == "__main__":
+    print(range_product(1, 6))                # Output: 120
+    print(product_tree([1, 2, 3, 4, 5]))      # Output: 120
+    print(binary_split_factorial(5))          # Output: 120
+    print(prime_swing_factorial(10))          # Output: 3628800
+    print(factorial(3000) == math.factorial(3000))  # Output: True
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Multiplying one term at a time keeps one operand huge and the other tiny,
+#   which wastes Python's Karatsuba multiplication.
+# - A product tree multiplies equal-sized numbers at every level.
+# - Prime swing multiplies even less: (n//2)! is reused by squaring and the rest
+#   is a product of prime powers.
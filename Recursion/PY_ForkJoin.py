@@ -0,0 +1,324 @@
+"""
+Fork/Join: Divide-and-Conquer Recursion on Many Cores
+
+non_tail_recursive_sum(n) walks n, n-1, n-2, ... one step at a time. But a sum
+over a range can be split in half, and each half solved on its own:
+
+    sum(1..n) = sum(1..n/2) + sum(n/2+1..n)
+
+That is divide-and-conquer recursion, and the two halves are independent, so
+they can run at the same time. The fork/join pattern describes it:
+
+- fork:  hand a subproblem to the pool and keep working on another one
+- join:  wait for a forked subproblem's result (and help with other work meanwhile)
+- cutoff (threshold): below this size, splitting costs more than it saves, so
+  the subproblem is solved sequentially
+
+Every problem is described by four small functions:
+
+    size(task)       -> how big the task is
+    split(task)      -> list of smaller tasks (an empty list means: solve it as a leaf)
+    leaf(task)       -> sequential answer for a small task
+    combine(results) -> answer for a task, from the answers of its parts
+
+ForkJoinPool has two modes:
+
+1. mode="thread": a real work-stealing scheduler. Each worker thread has its
+   own deque; it pushes forked tasks on the bottom and takes work from the
+   bottom, and idle workers steal from the *top* of someone else's deque (the
+   biggest, oldest tasks). Threads share the GIL, so this helps when leaf()
+   releases it (I/O, hashlib, many C extensions).
+
+2. mode="process": the task tree is split in the parent down to the cutoff and
+   the leaves go to a ProcessPoolExecutor. There are several leaves per worker,
+   and a worker that finishes early simply takes the next one, which balances
+   the load the way stealing would. leaf() must be a module-level function so
+   it can be pickled.
+
+Run `python PY_ForkJoin.py --bench` for the 1..N core scaling benchmark.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Topic 1: A work-stealing thread pool
+class _Task:
+    __slots__ = ("fn", "args", "result", "error", "done")
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = False
+
+    def run(self):
+        try:
+            self.result = self.fn(*self.args)
+        except BaseException as exc:
+            self.error = exc
+        self.done = True
+
+
+class WorkStealingPool:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._deques = [deque() for _ in range(self.workers)]
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def fork(self, fn, *args):
+        task = _Task(fn, args)
+        index = getattr(self._local, "index", None)
+        # Outside threads have no deque of their own, so they use a random one.
+        self._deques[index if index is not None else random.randrange(self.workers)].append(task)
+        with self._wakeup:
+            self._wakeup.notify()
+        return task
+
+    def join(self, task):
+        # Instead of blocking, a joining worker runs other tasks until its own is done.
+        while not task.done:
+            other = self._find_work()
+            if other is not None:
+                other.run()
+            else:
+                with self._wakeup:
+                    self._wakeup.wait(0.001)
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def invoke(self, fn, *args):
+        """Run fn(*args) in the pool and wait for its result (from any thread)."""
+        if getattr(self._local, "index", None) is not None:
+            return fn(*args)
+        task = self.fork(fn, *args)
+        while not task.done:
+            with self._wakeup:
+                self._wakeup.wait(0.001)
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def _find_work(self):
+        index = getattr(self._local, "index", None)
+        if index is not None:
+            try:
+                return self._deques[index].pop()  # own deque: newest task first
+            except IndexError:
+                pass
+        start = random.randrange(self.workers)
+        for offset in range(self.workers):
+            victim = (start + offset) % self.workers
+            if victim == index:
+                continue
+            try:
+                return self._deques[victim].popleft()  # steal: oldest (largest) task
+            except IndexError:
+                continue
+        return None
+
+    def _worker(self, index):
+        self._local.index = index
+        while not self._closed:
+            task = self._find_work()
+            if task is not None:
+                task.run()
+            else:
+                with self._wakeup:
+                    self._wakeup.wait(0.01)
+
+    def shutdown(self):
+        self._closed = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+# Topic 2: The fork/join driver
+class ForkJoinPool:
+    def __init__(self, workers=None, mode="thread"):
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        if mode == "thread":
+            self._pool = WorkStealingPool(self.workers)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def solve(self, task, *, size, split, leaf, combine, threshold):
+        _check_threshold(threshold)
+        if self.mode == "thread":
+            return self._pool.invoke(self._solve_threaded, task, size, split, leaf, combine, threshold)
+        return self._solve_processes(task, size, split, leaf, combine, threshold)
+
+    def _solve_threaded(self, task, size, split, leaf, combine, threshold):
+        if size(task) <= threshold:
+            return leaf(task)
+        subtasks = list(split(task))
+        if not subtasks:
+            return leaf(task)
+        first, *rest = subtasks
+        forked = [self._pool.fork(self._solve_threaded, sub, size, split, leaf, combine, threshold)
+                  for sub in rest]
+        results = [self._solve_threaded(first, size, split, leaf, combine, threshold)]
+        # Join the most recently forked first: it is still on our own deque.
+        results.extend(reversed([self._pool.join(t) for t in reversed(forked)]))
+        return combine(results)
+
+    def _solve_processes(self, task, size, split, leaf, combine, threshold):
+        leaves = []
+
+        def build(node):
+            # The tree shape is kept so combine() sees results in the same order
+            # as in sequential recursion.
+            subtasks = list(split(node)) if size(node) > threshold else []
+            if not subtasks:
+                leaves.append(node)
+                return len(leaves) - 1
+            return [build(sub) for sub in subtasks]
+
+        tree = build(task)
+        results = list(self._pool.map(leaf, leaves))
+
+        def fold(node):
+            if isinstance(node, int):
+                return results[node]
+            return combine([fold(child) for child in node])
+
+        return fold(tree)
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def sequential_solve(task, *, size, split, leaf, combine, threshold):
+    """Same recursion without any pool, for comparison and for tiny inputs."""
+    _check_threshold(threshold)
+    subtasks = list(split(task)) if size(task) > threshold else []
+    if not subtasks:
+        return leaf(task)
+    return combine([sequential_solve(sub, size=size, split=split, leaf=leaf, combine=combine,
+                                     threshold=threshold) for sub in subtasks])
+
+
+def _check_threshold(threshold):
+    # With threshold 0 a task of size 1 would be split again and again.
+    if threshold < 1:
+        raise ValueError(f"threshold must be at least 1, not {threshold!r}")
+
+
+# Topic 3: Ranges as tasks
+# A task is a (lo, hi) pair meaning range(lo, hi); these are module-level so the
+# process pool can pickle them.
+MODULUS = (1 << 61) - 1  # a Mersenne prime; products over 10^8 numbers must be reduced
+
+
+def range_size(task):
+    return task[1] - task[0]
+
+
+def split_range(task):
+    lo, hi = task
+    mid = (lo + hi) // 2
+    return [(lo, mid), (mid, hi)]
+
+
+def sum_leaf(task):
+    return sum(range(*task))
+
+
+def product_mod_leaf(task):
+    result = 1
+    for i in range(*task):
+        result = result * i % MODULUS
+    return result
+
+
+def combine_sum(results):
+    return sum(results)
+
+
+def combine_product_mod(results):
+    result = 1
+    for r in results:
+        result = result * r % MODULUS
+    return result
+
+
+# Example 1: the divide-and-conquer version of non_tail_recursive_sum
+def parallel_sum(n, pool, threshold=10**6):
+    return pool.solve((1, n + 1), size=range_size, split=split_range, leaf=sum_leaf,
+                      combine=combine_sum, threshold=threshold)
+
+
+def parallel_product_mod(lo, hi, pool, threshold=10**6):
+    return pool.solve((lo, hi), size=range_size, split=split_range, leaf=product_mod_leaf,
+                      combine=combine_product_mod, threshold=threshold)
+
+
+def benchmark(n=10**8, threshold=None):
+    # Cut the range into about 64 leaves so every worker count has spare tasks to take.
+    threshold = threshold or max(1, n // 64)
+    max_workers = os.cpu_count() or 1
+    print(f"n={n}, threshold={threshold}, cores={max_workers}")
+    print(f"{'workers':>8} {'sum (s)':>10} {'speedup':>8} {'product (s)':>12} {'speedup':>8}")
+    base_sum = base_product = None
+    for workers in range(1, max_workers + 1):
+        with ForkJoinPool(workers, mode="process") as pool:
+            parallel_sum(1000, pool, threshold=100)  # start the worker processes first
+            start = time.perf_counter()
+            parallel_sum(n, pool, threshold)
+            t_sum = time.perf_counter() - start
+            start = time.perf_counter()
+            parallel_product_mod(1, n + 1, pool, threshold)
+            t_product = time.perf_counter() - start
+        base_sum = base_sum or t_sum
+        base_product = base_product or t_product
+        print(f"{workers:>8} {t_sum:>10.3f} {base_sum / t_sum:>7.2f}x {t_product:>12.3f} {base_product / t_product:>7.2f}x")
+
+
+if __name__ == "__main__":
+    with ForkJoinPool(4, mode="thread") as pool:
+        print(parallel_sum(5, pool, threshold=1))               # Output: 15
+        print(parallel_sum(10**6, pool, threshold=10**4))       # Output: 500000500000
+    with ForkJoinPool(2, mode="process") as pool:
+        print(parallel_sum(10**6, pool, threshold=10**5))       # Output: 500000500000
+        print(parallel_product_mod(1, 17, pool, threshold=4))   # Output: 20922789888000 (16!)
+    print(sequential_solve((1, 6), size=range_size, split=split_range, leaf=sum_leaf,
+                           combine=combine_sum, threshold=1))   # Output: 15
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Divide-and-conquer recursion creates independent subproblems that can run in parallel.
+# - Work stealing keeps every worker busy without a central scheduler.
+# - A sequential cutoff stops splitting once tasks are too small to be worth it.
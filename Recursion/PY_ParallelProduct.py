@@ -0,0 +1,171 @@
+"""
+Parallel Product Trees with a Process Pool
+
+A product tree (see PY_Factorial.py) makes a huge product fast, but it still runs
+on one core. Multiplication is associative, so we can split the work:
+
+    1 * 2 * ... * n  =  (chunk 1 product) * (chunk 2 product) * ... * (chunk k product)
+
+Each chunk product is computed in a separate process, then the partial results
+are merged pairwise (again in the pool) until one number is left.
+
+Why processes and not threads? Big-int multiplication holds the GIL, so threads
+would take turns instead of running together.
+
+The catch: every partial product has to be pickled and sent between processes.
+For small inputs that copying costs more than the multiplication it saves, so a
+crossover heuristic decides when the pool is worth it:
+
+- worth_parallel() compares the estimated size of the result (in bits) with
+  PARALLEL_MIN_BITS, and only says yes when more than one worker is available.
+- calibrate() measures the real crossover on this machine and updates
+  PARALLEL_MIN_BITS.
+
+Run `python PY_ParallelProduct.py --bench` to calibrate and compare.
+"""
+
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PY_Factorial import factorial, product_tree, range_product
+
+
+# Results smaller than this (about 2 million bits, n! for n near 10^5) are
+# computed in the current process. calibrate() can tune it.
+PARALLEL_MIN_BITS = 1 << 21
+
+
+# Topic 1: The crossover heuristic
+def estimated_factorial_bits(n):
+    # log2(n!) = lgamma(n+1) / ln(2), good to a few bits without computing n!
+    return int(math.lgamma(n + 1) / math.log(2)) + 1
+
+
+def estimated_product_bits(values):
+    return sum(abs(v).bit_length() for v in values)
+
+
+def worth_parallel(result_bits, workers):
+    return workers > 1 and result_bits >= PARALLEL_MIN_BITS
+
+
+def _default_workers():
+    return os.cpu_count() or 1
+
+
+# Topic 2: Worker tasks (module-level so they can be pickled)
+def _range_product_task(bounds):
+    lo, hi = bounds
+    return range_product(lo, hi)
+
+
+def _multiply_pair(a, b):
+    return a * b
+
+
+def _split(lo, hi, parts):
+    return [(lo + (hi - lo) * i // parts, lo + (hi - lo) * (i + 1) // parts) for i in range(parts)]
+
+
+def _merge_pairwise(parts, pool):
+    # Each round halves the number of partial products; the last multiplication
+    # happens here, since sending one pair to a worker gains nothing.
+    while len(parts) > 2:
+        futures = [pool.submit(_multiply_pair, parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2)]
+        leftover = [parts[-1]] if len(parts) % 2 else []
+        parts = [future.result() for future in futures] + leftover
+    return product_tree(parts)
+
+
+# Example 1: Parallel factorial
+def parallel_factorial(n, workers=None, executor=None, force=False):
+    """n! computed in chunks across a process pool.
+
+    Falls back to the single-process factorial when worth_parallel() says the
+    pickling cost would not pay off, unless force=True.
+    """
+    if not isinstance(n, int) or n < 0:
+        raise ValueError("factorial() not defined for negative or non-integer values")
+    workers = workers or _default_workers()
+    if not force and not worth_parallel(estimated_factorial_bits(n), workers):
+        return factorial(n)
+    chunks = _split(2, n + 1, workers * 4)  # a few chunks per worker evens out the load
+    if executor is not None:
+        return _merge_pairwise(list(executor.map(_range_product_task, chunks)), executor)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge_pairwise(list(pool.map(_range_product_task, chunks)), pool)
+
+
+# Example 2: Parallel version of multiply(*args) from Functions/PY_Functions.py
+def parallel_multiply(*args, workers=None, executor=None, force=False):
+    """Product of all arguments, split across a process pool for huge integer inputs."""
+    if not all(isinstance(arg, int) for arg in args):
+        return math.prod(args)  # floats etc. are never worth shipping to a pool
+    workers = workers or _default_workers()
+    if not force and not worth_parallel(estimated_product_bits(args), workers):
+        return product_tree(args)
+    chunks = [args[lo:hi] for lo, hi in _split(0, len(args), workers * 4) if hi > lo]
+    if executor is not None:
+        return _merge_pairwise(list(executor.map(product_tree, chunks)), executor)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge_pairwise(list(pool.map(product_tree, chunks)), pool)
+
+
+# Topic 3: Measuring the crossover
+def calibrate(workers=None, start=10**4, stop=10**6):
+    """Find the smallest n (doubling from start) where the pool beats one process.
+
+    Updates PARALLEL_MIN_BITS and returns that n, or None if the pool never won.
+    """
+    global PARALLEL_MIN_BITS
+    workers = workers or _default_workers()
+    if workers < 2:
+        return None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parallel_factorial(1000, workers, pool, force=True)  # start the workers up front
+        n = start
+        while n <= stop:
+            sequential = _timed(factorial, n)
+            parallel = _timed(lambda m: parallel_factorial(m, workers, pool, force=True), n)
+            if parallel < sequential:
+                PARALLEL_MIN_BITS = estimated_factorial_bits(n)
+                return n
+            n *= 2
+    return None
+
+
+def _timed(func, n):
+    start = time.perf_counter()
+    func(n)
+    return time.perf_counter() - start
+
+
+def benchmark(sizes=(10**5, 3 * 10**5, 10**6), workers=None):
+    workers = workers or _default_workers()
+    print(f"workers: {workers}, crossover n: {calibrate(workers)}, PARALLEL_MIN_BITS: {PARALLEL_MIN_BITS}")
+    print(f"{'n':>9} {'factorial (s)':>14} {'parallel (s)':>14}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for n in sizes:
+            sequential = _timed(factorial, n)
+            parallel = _timed(lambda m: parallel_factorial(m, workers, pool, force=True), n)
+            print(f"{n:>9} {sequential:>14.3f} {parallel:>14.3f}")
+
+
+if __name__ == "__main__":
+    print(parallel_factorial(5))                        # Output: 120 (too small, runs in-process)
+    print(parallel_multiply(2, 3, 4))                   # Output: 24
+    print(parallel_factorial(2000, workers=2, force=True) == math.factorial(2000))  # Output: True
+    print(parallel_multiply(*range(1, 501), workers=2, force=True) == math.factorial(500))  # Output: True
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Associative operations like multiplication can be split into chunks and
+#   computed in parallel, then merged pairwise.
+# - Processes are needed because big-int arithmetic holds the GIL.
+# - Sending big numbers between processes is not free, so only large inputs
+#   use the pool; calibrate() finds where that starts on your machine.
@@ -0,0 +1,212 @@
+"""
+Profiling Recursive Functions
+
+cProfile tells you how often a function was called, but for recursion we also
+want to know *how* it recursed:
+
+- total calls and maximum depth
+- a depth histogram (how many calls happened at each depth)
+- time spent at each depth level (self time, children excluded)
+- how many calls repeated an argument tuple we had already seen.
+  Repeats are exactly the calls a memoization cache (functools.lru_cache)
+  would have answered for free.
+
+How it stays free when it is off:
+A recursive function finds itself through its global name, e.g. factorial(n-1)
+looks up `factorial` in the module's globals. RecursionProfiler.attach()
+temporarily swaps that name for an instrumented wrapper and puts the original
+back when the `with` block ends. Outside the block the function is untouched,
+so there is no flag check or wrapper at all.
+
+The profiler is meant for one thread at a time.
+"""
+
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+
+class _FunctionStats:
+    def __init__(self):
+        self.calls = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.total_time = 0.0                   # inclusive time of the outermost calls
+        self.depth_histogram = Counter()
+        self.self_time_by_depth = defaultdict(float)
+        self.arg_counts = Counter()
+        self.unhashable_calls = 0
+        self.child_time = []                    # one slot per active call
+
+    def to_dict(self, top=5):
+        repeated = sum(count - 1 for count in self.arg_counts.values())
+        return {
+            "calls": self.calls,
+            "max_depth": self.max_depth,
+            "total_time": self.total_time,
+            "depth_histogram": {str(d): n for d, n in sorted(self.depth_histogram.items())},
+            "self_time_by_depth": {str(d): t for d, t in sorted(self.self_time_by_depth.items())},
+            "distinct_args": len(self.arg_counts),
+            "repeated_calls": repeated,
+            "unhashable_calls": self.unhashable_calls,
+            "top_repeated_args": [
+                [_format_key(key), count] for key, count in self.arg_counts.most_common(top) if count > 1
+            ],
+        }
+
+
+def _format_key(key):
+    args, kwargs = key
+    parts = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs]
+    text = "(" + ", ".join(parts) + ")"
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+class RecursionProfiler:
+    def __init__(self):
+        self.stats = {}
+
+    def instrument(self, func, name=None):
+        """Return a wrapper around func that records into this profiler."""
+        stats = self.stats.setdefault(name or func.__qualname__, _FunctionStats())
+        clock = time.perf_counter
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats.calls += 1
+            depth = stats.depth = stats.depth + 1
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+            stats.depth_histogram[depth] += 1
+            try:
+                stats.arg_counts[(args, tuple(sorted(kwargs.items())))] += 1
+            except TypeError:
+                stats.unhashable_calls += 1
+            stats.child_time.append(0.0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stats.self_time_by_depth[depth] += elapsed - stats.child_time.pop()
+                if stats.child_time:
+                    stats.child_time[-1] += elapsed
+                else:
+                    stats.total_time += elapsed
+                stats.depth = depth - 1
+
+        return wrapper
+
+    @contextmanager
+    def attach(self, namespace, name):
+        """Instrument `name` in a module (or globals() dict) for the duration of the block."""
+        is_dict = isinstance(namespace, dict)
+        original = namespace[name] if is_dict else getattr(namespace, name)
+        wrapper = self.instrument(original, name)
+        if is_dict:
+            namespace[name] = wrapper
+        else:
+            setattr(namespace, name, wrapper)
+        try:
+            yield wrapper
+        finally:
+            if is_dict:
+                namespace[name] = original
+            else:
+                setattr(namespace, name, original)
+
+    def reset(self):
+        self.stats.clear()
+
+    # -- output ---------------------------------------------------------------
+    def report(self):
+        return {"functions": {name: stats.to_dict() for name, stats in self.stats.items()}}
+
+    def dump_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def format_table(self, max_rows=20, bar_width=30):
+        lines = []
+        for name, stats in self.stats.items():
+            info = stats.to_dict()
+            lines.append(f"== {name} ==")
+            lines.append(
+                f"calls: {info['calls']}  max depth: {info['max_depth']}  "
+                f"total: {info['total_time'] * 1e3:.3f} ms  "
+                f"repeated args: {info['repeated_calls']} of {info['calls']}"
+            )
+            lines.append(f"{'depth':>13} {'calls':>9} {'self ms':>10}  histogram")
+            rows = _bucket_depths(stats, max_rows)
+            peak = max((calls for _, calls, _ in rows), default=1)
+            for label, calls, seconds in rows:
+                bar = "#" * max(1, round(calls / peak * bar_width))
+                lines.append(f"{label:>13} {calls:>9} {seconds * 1e3:>10.3f}  {bar}")
+            for args, count in info["top_repeated_args"]:
+                lines.append(f"  repeated {count}x: {args}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+def _bucket_depths(stats, max_rows):
+    # Deep recursion has thousands of levels; group them into at most max_rows rows.
+    if not stats.depth_histogram:
+        return []
+    deepest = max(stats.depth_histogram)
+    width = max(1, -(-deepest // max_rows))
+    rows = []
+    for lo in range(1, deepest + 1, width):
+        hi = min(lo + width - 1, deepest)
+        calls = sum(stats.depth_histogram.get(d, 0) for d in range(lo, hi + 1))
+        seconds = sum(stats.self_time_by_depth.get(d, 0.0) for d in range(lo, hi + 1))
+        label = str(lo) if lo == hi else f"{lo}-{hi}"
+        rows.append((label, calls, seconds))
+    return rows
+
+
+# Example functions (same as PY_recursoin.py)
+def factorial(n):
+    if n == 0:
+        return 1
+    else:
+        return n * factorial(n-1)
+
+
+def non_tail_recursive_sum(n):
+    if n == 0:
+        return 0
+    else:
+        return n + non_tail_recursive_sum(n-1)
+
+
+def fibonacci(n):
+    # Tree recursion: the repeated-args counter shows why this needs a cache.
+    if n < 2:
+        return n
+    return fibonacci(n-1) + fibonacci(n-2)
+
+
+if __name__ == "__main__":
+    profiler = RecursionProfiler()
+    module = sys.modules[__name__]
+    with profiler.attach(module, "factorial"):
+        factorial(50)
+    with profiler.attach(module, "non_tail_recursive_sum"):
+        for _ in range(3):
+            non_tail_recursive_sum(200)
+    with profiler.attach(module, "fibonacci"):
+        fibonacci(15)
+
+    print(profiler.format_table())
+    print(json.dumps(profiler.report()["functions"]["fibonacci"]["top_repeated_args"]))
+    # Output: [["(1)", 610], ["(2)", 377], ["(0)", 377], ["(3)", 233], ["(4)", 144]]
+    if len(sys.argv) > 1 and sys.argv[1].endswith(".json"):
+        profiler.dump_json(sys.argv[1])
+
+# Summary:
+# - Swapping a function's global name for a wrapper instruments every recursive call.
+# - Restoring the name afterwards makes the "off" state cost nothing.
+# - Many repeated argument tuples means memoization would pay off.
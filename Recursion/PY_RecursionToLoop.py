@@ -0,0 +1,324 @@
+"""
+Turning Recursion into Loops with the ast Module
+
+PY_Trampoline.py keeps recursion but moves it off the stack. Here we go one step
+further: the @loopify decorator reads the function's source code, rewrites its
+syntax tree (AST = Abstract Syntax Tree) and compiles a plain `while` loop.
+The result runs at loop speed and never hits the recursion limit.
+
+Two shapes are recognised:
+
+1. Tail recursion - the self-call is the whole return value:
+
+       def tail_recursive_factorial(n, accumulator=1):        def tail_recursive_factorial(n, accumulator=1):
+           if n == 0:                                              while True:
+               return accumulator                   ==>                if n == 0:
+           else:                                                           return accumulator
+               return tail_recursive_factorial(n-1, n * accumulator)   else:
+                                                                           n, accumulator = (n-1, n * accumulator)
+                                                                           continue
+
+2. Linear recursion - one operand of +, *, |, & or ^ is the self-call:
+
+       return n + non_tail_recursive_sum(n-1)
+
+   The pending `n + ...` parts are folded into a hidden accumulator while the
+   loop runs, and the base case result is combined with it at the end. This is
+   only correct because those operators are associative:
+   (a + b) + c == a + (b + c). For floats the rounding can differ slightly.
+
+Anything else (two self-calls, a self-call inside a loop or a with/try
+block, *args...) raises
+UnsupportedRecursion at definition time, so nothing is silently changed.
+"""
+
+import ast
+import inspect
+import sys
+import textwrap
+import time
+from functools import update_wrapper
+
+
+class UnsupportedRecursion(TypeError):
+    """The function is not in a shape @loopify knows how to rewrite."""
+
+
+# Associative operators that may be folded into an accumulator
+_ASSOCIATIVE = (ast.Add, ast.Mult, ast.BitOr, ast.BitAnd, ast.BitXor)
+
+# Blocks whose exit code (__exit__, except, finally) must run once per level of recursion
+_TRY = (ast.Try, ast.TryStar) if hasattr(ast, "TryStar") else (ast.Try,)
+
+_ACC = "_loop_acc"
+_HAS_ACC = "_loop_has_acc"
+_TERM = "_loop_term"
+
+
+def _is_self_call(node, name):
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == name
+    )
+
+
+def _name(id, ctx=None):
+    return ast.Name(id=id, ctx=ctx or ast.Load())
+
+
+class _Rewriter:
+    def __init__(self, fdef):
+        self.fdef = fdef
+        self.name = fdef.name
+        self.op = None         # operator class used by linear recursion
+        self.side = None       # "left" for `E op f(...)`, "right" for `f(...) op E`
+        self.rewrote = False
+
+    # -- parameters -----------------------------------------------------------
+    def _check_signature(self):
+        args = self.fdef.args
+        if args.vararg or args.kwarg:
+            raise UnsupportedRecursion(f"{self.name}: *args/**kwargs are not supported")
+        self.positional = [a.arg for a in args.posonlyargs + args.args]
+        self.kwonly = [a.arg for a in args.kwonlyargs]
+        self.n_defaults = len(args.defaults)
+        self.kw_defaults = {a.arg for a, d in zip(args.kwonlyargs, args.kw_defaults) if d is not None}
+
+    def _default(self, param):
+        # Missing arguments take the function's default, read from the live
+        # function object exactly like a normal call would.
+        if param in self.positional:
+            index = self.positional.index(param) - (len(self.positional) - self.n_defaults)
+            if index < 0:
+                raise UnsupportedRecursion(f"{self.name}: call is missing argument {param!r}")
+            attr, key = "__defaults__", ast.Constant(index)
+        elif param in self.kw_defaults:
+            attr, key = "__kwdefaults__", ast.Constant(param)
+        else:
+            raise UnsupportedRecursion(f"{self.name}: call is missing argument {param!r}")
+        return ast.Subscript(value=ast.Attribute(value=_name(self.name), attr=attr, ctx=ast.Load()),
+                             slice=key, ctx=ast.Load())
+
+    def _rebind(self, call):
+        # f(a, b, c=d) -> (param1, param2, c) = (a, b, d)
+        if any(isinstance(a, ast.Starred) for a in call.args) or any(k.arg is None for k in call.keywords):
+            raise UnsupportedRecursion(f"{self.name}: *args/**kwargs in the self-call are not supported")
+        params = self.positional + self.kwonly
+        if len(call.args) > len(self.positional):
+            raise UnsupportedRecursion(f"{self.name}: too many positional arguments in the self-call")
+        values = dict(zip(self.positional, call.args))
+        for keyword in call.keywords:
+            values[keyword.arg] = keyword.value
+        targets = [_name(p, ast.Store()) for p in params]
+        exprs = [values[p] if p in values else self._default(p) for p in params]
+        return ast.Assign(targets=[ast.Tuple(elts=targets, ctx=ast.Store())],
+                          value=ast.Tuple(elts=exprs, ctx=ast.Load()))
+
+    # -- return statements ----------------------------------------------------
+    def _combine(self, term):
+        # The accumulator sits on the same side as the pending operands did.
+        op = self.op()
+        if self.side == "left":
+            return ast.BinOp(left=_name(_ACC), op=op, right=term)
+        return ast.BinOp(left=term, op=op, right=_name(_ACC))
+
+    def _fold(self, term):
+        # _loop_term = term; _loop_acc = combine(...) if _loop_has_acc else _loop_term
+        return [
+            ast.Assign(targets=[_name(_TERM, ast.Store())], value=term),
+            ast.If(
+                test=_name(_HAS_ACC),
+                body=[ast.Assign(targets=[_name(_ACC, ast.Store())], value=self._combine(_name(_TERM)))],
+                orelse=[
+                    ast.Assign(targets=[_name(_ACC, ast.Store())], value=_name(_TERM)),
+                    ast.Assign(targets=[_name(_HAS_ACC, ast.Store())], value=ast.Constant(True)),
+                ],
+            ),
+        ]
+
+    def _linear_parts(self, value):
+        if not isinstance(value, ast.BinOp) or not isinstance(value.op, _ASSOCIATIVE):
+            return None
+        if _is_self_call(value.right, self.name):
+            side, term, call = "left", value.left, value.right
+        elif _is_self_call(value.left, self.name):
+            side, term, call = "right", value.right, value.left
+        else:
+            return None
+        if (self.op, self.side) not in ((None, None), (type(value.op), side)):
+            raise UnsupportedRecursion(f"{self.name}: returns mix different recursive operators")
+        self.op, self.side = type(value.op), side
+        return term, call
+
+    def _rewrite_return(self, node, in_loop, guard):
+        value = node.value
+        linear = None
+        if not _is_self_call(value, self.name):
+            linear = self._linear_parts(value) if value is not None else None
+            if linear is None:
+                return [node]  # a base case, finished later in _finish_base_cases
+        if in_loop:
+            raise UnsupportedRecursion(f"{self.name}: self-call inside a for/while loop")
+        if guard:
+            # `continue` would leave the with/try block once per level instead of nesting them
+            raise UnsupportedRecursion(f"{self.name}: self-call inside a {guard} block")
+        self.rewrote = True
+        if linear is None:
+            return [self._rebind(value), ast.Continue()]
+        term, call = linear
+        return self._fold(term) + [self._rebind(call), ast.Continue()]
+
+    def _walk(self, body, in_loop=False, guard=None):
+        new_body = []
+        for stmt in body:
+            if isinstance(stmt, ast.Return):
+                new_body.extend(self._rewrite_return(stmt, in_loop, guard))
+                continue
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                new_body.append(stmt)  # nested scopes are left alone
+                continue
+            loop = isinstance(stmt, (ast.For, ast.While, ast.AsyncFor))
+            inner_guard = guard
+            if isinstance(stmt, (ast.With, ast.AsyncWith)):
+                inner_guard = guard or "with"
+            elif isinstance(stmt, _TRY):
+                inner_guard = guard or "try"
+            for field in ("body", "orelse", "finalbody"):
+                block = getattr(stmt, field, None)
+                if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                    setattr(stmt, field, self._walk(block, in_loop or (loop and field == "body"), inner_guard))
+            for handler in getattr(stmt, "handlers", []):
+                handler.body = self._walk(handler.body, in_loop, inner_guard)
+            for case in getattr(stmt, "cases", []):
+                case.body = self._walk(case.body, in_loop, inner_guard)
+            new_body.append(stmt)
+        return new_body
+
+    def _finish_base_cases(self, body):
+        # With an accumulator, `return X` becomes `return combine(acc, X)`.
+        class BaseCases(ast.NodeTransformer):
+            def visit_FunctionDef(inner, node):
+                return node
+
+            visit_AsyncFunctionDef = visit_Lambda = visit_ClassDef = visit_FunctionDef
+
+            def visit_Return(inner, node):
+                term = node.value if node.value is not None else ast.Constant(None)
+                return [
+                    ast.Assign(targets=[_name(_TERM, ast.Store())], value=term),
+                    ast.If(test=_name(_HAS_ACC), body=[ast.Return(value=self._combine(_name(_TERM)))], orelse=[]),
+                    ast.Return(value=_name(_TERM)),
+                ]
+
+        return [BaseCases().visit(stmt) for stmt in body]
+
+    def rewrite(self):
+        self._check_signature()
+        body = self._walk(self.fdef.body)
+        if not self.rewrote:
+            raise UnsupportedRecursion(f"{self.name}: no self-call in a supported position")
+        for node in ast.walk(ast.Module(body=body, type_ignores=[])):
+            if _is_self_call(node, self.name):
+                raise UnsupportedRecursion(f"{self.name}: self-call in an unsupported position")
+        prologue = []
+        if self.op is not None:
+            body = self._finish_base_cases(body)
+            prologue = [
+                ast.Assign(targets=[_name(_ACC, ast.Store())], value=ast.Constant(None)),
+                ast.Assign(targets=[_name(_HAS_ACC, ast.Store())], value=ast.Constant(False)),
+            ]
+        docstring = []
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            docstring, body = body[:1], body[1:]
+        self.fdef.body = docstring + prologue + [ast.While(test=ast.Constant(True), body=body, orelse=[])]
+        self.fdef.decorator_list = []
+        return self.fdef
+
+
+def loopify(func):
+    """Rewrite a tail or linear recursive function into a while loop.
+
+    The generated source is kept in func.__loop_source__ so you can read it.
+    """
+    if func.__code__.co_freevars:
+        raise UnsupportedRecursion(f"{func.__name__}: closures are not supported")
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError) as exc:
+        raise UnsupportedRecursion(f"{func.__name__}: source code is not available") from exc
+    module = ast.parse(source)
+    fdef = module.body[0]
+    if not isinstance(fdef, ast.FunctionDef) or fdef.name != func.__name__:
+        raise UnsupportedRecursion(f"{func.__name__}: could not find the function definition")
+    module.body = [_Rewriter(fdef).rewrite()]
+    ast.fix_missing_locations(module)
+    ast.increment_lineno(module, func.__code__.co_firstlineno - 1)
+    code = compile(module, inspect.getsourcefile(func) or "<loopify>", "exec")
+    namespace = {}
+    exec(code, func.__globals__, namespace)  # new function shares the original's globals
+    new_func = namespace[func.__name__]
+    new_func.__defaults__ = func.__defaults__
+    new_func.__kwdefaults__ = func.__kwdefaults__
+    update_wrapper(new_func, func)
+    new_func.__loop_source__ = ast.unparse(module)
+    return new_func
+
+
+# Example 1: tail_recursive_factorial from PY_recursoin.py
+@loopify
+def tail_recursive_factorial(n, accumulator=1):
+    if n == 0:
+        return accumulator
+    else:
+        return tail_recursive_factorial(n-1, n * accumulator)
+
+
+# Example 2: non_tail_recursive_sum from PY_recursoin.py
+@loopify
+def non_tail_recursive_sum(n):
+    if n == 0:
+        return 0
+    else:
+        return n + non_tail_recursive_sum(n-1)
+
+
+# Example 3: the recursive factorial itself is linear recursion over *
+@loopify
+def factorial(n):
+    if n == 0:
+        return 1
+    else:
+        return n * factorial(n-1)
+
+
+def benchmark(n=10**6):
+    def loop_sum(n):
+        total = 0
+        while n:
+            total += n
+            n -= 1
+        return total
+
+    for name, func in (("loop_sum", loop_sum), ("loopified non_tail_recursive_sum", non_tail_recursive_sum)):
+        start = time.perf_counter()
+        func(n)
+        print(f"{name:<34} n={n}: {time.perf_counter() - start:.4f} s")
+
+
+if __name__ == "__main__":
+    print(tail_recursive_factorial(5))    # Output: 120
+    print(non_tail_recursive_sum(5))      # Output: 15
+    print(factorial(5))                   # Output: 120
+    print(non_tail_recursive_sum(100000)) # Output: 5000050000 (far past the recursion limit)
+    print(non_tail_recursive_sum.__loop_source__)
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - The ast module lets a decorator read and rewrite a function before it ever runs.
+# - A tail call is the same as "change the parameters and start again": a loop.
+# - A linear `E op f(...)` recursion can be turned into a loop with an accumulator,
+#   as long as op is associative.
@@ -0,0 +1,209 @@
+"""
+Trampolines and Continuations in Python
+
+CPython does not eliminate tail calls. Every recursive call pushes a new frame,
+and once the depth passes sys.getrecursionlimit() (about 1000 by default) we get:
+
+    RecursionError: maximum recursion depth exceeded
+
+So tail_recursive_factorial(5000) and non_tail_recursive_sum(5000) from
+PY_recursoin.py both crash, even though the work they do is tiny.
+
+This file shows two ways of running recursive code in constant stack depth:
+
+1. @trampoline  -> for tail-recursive (accumulator-style) functions.
+   A self-call in tail position does not recurse; it returns a small TailCall
+   "bounce" object, and a loop in the decorator keeps calling the function
+   until a real value comes back. The function body does not change.
+
+2. @stackless   -> for non-tail recursion (n + f(n-1)).
+   The function is written as a generator and every recursive call is wrapped
+   in `yield`. The yield hands the pending call to a driver loop, which keeps
+   the "rest of the computation" (the continuation) on an explicit Python list
+   instead of the C stack.
+
+Run `python PY_Trampoline.py --bench` to compare both against a plain loop.
+"""
+
+import sys
+import threading
+import time
+from functools import wraps
+from types import GeneratorType
+
+
+# Topic 1: The trampoline
+# A TailCall records the arguments of a call we have not made yet.
+class TailCall:
+    __slots__ = ("args", "kwargs")
+
+    def __init__(self, args, kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+def trampoline(func):
+    """Run a tail-recursive function in a loop instead of on the stack.
+
+    Only self-calls in tail position are supported: `return f(...)`.
+    A self-call used inside an expression (like `n + f(n-1)`) would receive a
+    TailCall object instead of a number; use @stackless for those.
+    """
+    state = threading.local()  # each thread gets its own "am I bouncing?" flag
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(state, "active", False):
+            # We are already inside the loop below, so this is the recursive
+            # self-call: do not run it, just describe it.
+            return TailCall(args, kwargs)
+        state.active = True
+        try:
+            result = func(*args, **kwargs)
+            while type(result) is TailCall:
+                result = func(*result.args, **result.kwargs)
+            return result
+        finally:
+            state.active = False
+
+    return wrapper
+
+
+# Example 1: tail_recursive_factorial from PY_recursoin.py, unchanged except for the decorator
+@trampoline
+def tail_recursive_factorial(n, accumulator=1):
+    if n == 0:
+        return accumulator
+    else:
+        return tail_recursive_factorial(n-1, n * accumulator)
+
+
+# Example 2: an accumulator version of the sum, used by the benchmark below
+@trampoline
+def tail_recursive_sum(n, accumulator=0):
+    if n == 0:
+        return accumulator
+    else:
+        return tail_recursive_sum(n-1, n + accumulator)
+
+
+# Topic 2: The continuation engine
+def _drive(gen):
+    # stack holds suspended generators; each one is waiting for the value of
+    # the recursive call it yielded. That list *is* the continuation.
+    stack = [gen]
+    value = None
+    error = None
+    while stack:
+        top = stack[-1]
+        try:
+            if error is not None:
+                exc, error = error, None
+                request = top.throw(exc)
+            else:
+                request = top.send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        except BaseException as exc:
+            stack.pop()
+            if not stack:
+                raise
+            error = exc  # re-raise it inside the caller at its `yield`
+            continue
+        if type(request) is GeneratorType:
+            stack.append(request)  # a recursive call: run it first
+            value = None
+        else:
+            value = request  # yielding a plain value just sends it back
+    return value
+
+
+def stackless(func):
+    """Run a generator-based recursive function with an explicit stack.
+
+    Write every recursive call as `(yield f(...))`. Outside the engine the
+    decorated function behaves like a normal function and returns a value.
+    """
+    state = threading.local()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(state, "active", False):
+            return func(*args, **kwargs)  # an un-started generator for _drive
+        state.active = True
+        try:
+            return _drive(func(*args, **kwargs))
+        finally:
+            state.active = False
+
+    return wrapper
+
+
+# Example 3: non_tail_recursive_sum from PY_recursoin.py with the call wrapped in yield
+@stackless
+def non_tail_recursive_sum(n):
+    if n == 0:
+        return 0
+    else:
+        return n + (yield non_tail_recursive_sum(n-1))
+
+
+# Plain loops: the baseline both engines are measured against
+def loop_factorial(n):
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+
+def loop_sum(n):
+    total = 0
+    while n:
+        total += n
+        n -= 1
+    return total
+
+
+def benchmark(sizes=(10**5, 10**6), repeat=3):
+    """Print time per level of recursion for each engine against a loop."""
+    print(f"{'n':>9} {'function':<28} {'best (s)':>10} {'ns/level':>10} {'overhead':>9}")
+    for n in sizes:
+        cases = [
+            ("loop_sum", loop_sum),
+            ("tail_recursive_sum", tail_recursive_sum),
+            ("non_tail_recursive_sum", non_tail_recursive_sum),
+        ]
+        baseline = None
+        for name, func in cases:
+            best = min(_time_once(func, n) for _ in range(repeat))
+            if baseline is None:
+                baseline = best
+            print(f"{n:>9} {name:<28} {best:>10.4f} {best / n * 1e9:>10.1f} {best / baseline:>8.1f}x")
+
+
+def _time_once(func, n):
+    start = time.perf_counter()
+    func(n)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(tail_recursive_factorial(5))        # Output: 120
+    print(non_tail_recursive_sum(5))          # Output: 15
+
+    # Both of these would raise RecursionError without the decorators.
+    depth = sys.getrecursionlimit() * 10
+    print(tail_recursive_factorial(depth) == loop_factorial(depth))  # Output: True
+    print(non_tail_recursive_sum(depth))      # Output: 50005000
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Python keeps one frame per active call, so deep recursion runs out of stack.
+# - A trampoline turns tail calls into a loop; the stack never grows.
+# - A generator-based continuation engine moves pending work onto a list, which
+#   handles non-tail recursion too, at the cost of one generator per level.
+# - Both are slower than a hand-written loop; the benchmark shows by how much.
@@ -12,6 +12,7 @@ def factorial(n):
 print(factorial(5))  # Output: 120
 # Explanation:
 # The factorial function calls itself with a decremented value of n until it reaches 0.
+# For large n this one-term-at-a-time product is slow; see PY_Factorial.py for faster methods.
 
 # Types of Recursion:
 # 1. Tail Recursion: The recursive call is the last operation in the function.
@@ -28,4 +29,8 @@ def non_tail_recursive_sum(n):
         return 0
     else:
         return n + non_tail_recursive_sum(n-1)
-print(non_tail_recursive_sum(5))  # Output: 15
\ No newline at end of file
+print(non_tail_recursive_sum(5))  # Output: 15
+
+# Note: CPython does not optimize tail calls, so both functions above still raise
+# RecursionError once n passes sys.getrecursionlimit() (about 1000).
+# See PY_Trampoline.py for versions that run in constant stack depth.
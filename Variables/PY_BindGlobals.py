@@ -0,0 +1,336 @@
+"""
+Binding Global Names into a Function
+
+PY_GlobalAndLocalVariables.py shows that a function can read module-level names
+such as global_var. Python looks such a name up *every time* the line runs:
+
+    LOAD_FAST    x        local variable:  an index into the frame's array
+    LOAD_GLOBAL  len      global/builtin:  look in the module dict, then in builtins
+
+In a hot loop those lookups add up. The usual hand-written trick is to copy
+the global into a local name once:
+
+    def count_long(words, _len=len): ...
+
+@bind_globals does that for you, in one of two ways:
+
+- mode="const": the function's bytecode is rewritten so that every
+  LOAD_GLOBAL of a bound name becomes LOAD_CONST of the value itself. The
+  object is stored in the code's constants, so no lookup happens at all.
+  Works for any function, also closures.
+- mode="local": the source is rewritten so the names become keyword-only
+  parameters with the current values as defaults (def f(x, *, len=len)), so
+  every read is a LOAD_FAST. Needs the source, no closures.
+
+Which names are bound: names=[...] if you list them; otherwise every builtin the
+function uses (len, print, range, ...) and every global whose value is an
+immutable constant (int, float, str, bytes, bool, None, tuple, frozenset).
+Names the function assigns with `global` are never bound.
+
+The catch: a bound value is a snapshot. If the global is reassigned later (as
+modify_global() does), the function still sees the old value. So:
+
+- stale(func)    -> names whose global has changed since binding
+- rebind(func)   -> take the current values (rebind() with no argument: all functions)
+- unbind(func)   -> restore the original function
+- assign(namespace, name, value) -> set the global and rebind every function
+                                    that bound it, in one step
+
+How much it helps depends on the Python version. Up to 3.10 every LOAD_GLOBAL
+is two dict lookups, and binding saves a lot. Since 3.11 the interpreter
+caches global lookups itself ("specialization"), so the difference is much
+smaller: on 3.11, benchmark() shows mode="local" about 10% faster than plain
+globals and mode="const" about even. That is because the rewritten bytecode
+keeps the size of each LOAD_GLOBAL instruction (a jump skips its unused
+inline cache slots), so jump targets, line numbers and exception tables stay
+valid, at the price of one extra instruction.
+"""
+
+import ast
+import builtins
+import dis
+import inspect
+import opcode
+import sys
+import textwrap
+import time
+
+
+_CONSTANT_TYPES = (int, float, complex, str, bytes, bool, type(None), tuple, frozenset)
+_NULL_BIT = sys.version_info >= (3, 11)        # LOAD_GLOBAL's low bit means "also push NULL"
+_NULL_AFTER = sys.version_info >= (3, 13)      # ... pushed after the value instead of before
+_LOAD_GLOBAL = opcode.opmap["LOAD_GLOBAL"]
+_LOAD_CONST = opcode.opmap["LOAD_CONST"]
+_NOP = opcode.opmap["NOP"]
+_EXTENDED_ARG = opcode.opmap["EXTENDED_ARG"]
+_PUSH_NULL = opcode.opmap.get("PUSH_NULL")
+_JUMP_FORWARD = opcode.opmap["JUMP_FORWARD"]
+
+_bound = {}   # function -> (original code, original kwdefaults, mode, {name: bound value})
+
+
+def _cache_units(op):
+    entries = getattr(opcode, "_inline_cache_entries", None)
+    if entries is None:
+        return 0
+    if isinstance(entries, dict):   # Python 3.13+: keyed by name
+        return entries.get(opcode.opname[op], 0)
+    return entries[op]
+
+
+# Topic 1: Which names can be bound?
+def _global_names(code):
+    """Return (names read with LOAD_GLOBAL, names written with STORE/DELETE_GLOBAL), nested code included."""
+    loads, stores = set(), set()
+    for ins in dis.get_instructions(code):
+        if ins.opname == "LOAD_GLOBAL":
+            loads.add(ins.argval)
+        elif ins.opname in ("STORE_GLOBAL", "DELETE_GLOBAL"):
+            stores.add(ins.argval)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            inner_loads, inner_stores = _global_names(const)
+            loads |= inner_loads
+            stores |= inner_stores
+    return loads, stores
+
+
+def _lookup(func, name):
+    if name in func.__globals__:
+        return func.__globals__[name]
+    builtins_ns = func.__globals__.get("__builtins__", builtins)
+    builtins_ns = builtins_ns if isinstance(builtins_ns, dict) else vars(builtins_ns)
+    if name in builtins_ns:
+        return builtins_ns[name]
+    raise NameError(f"name {name!r} is not defined")
+
+
+def _choose(func, code, names):
+    loads, stores = _global_names(code)
+    if names is not None:
+        unknown = set(names) - loads
+        if unknown:
+            raise ValueError(f"{func.__name__} does not read the global(s) {sorted(unknown)}")
+        if set(names) & stores:
+            raise ValueError(f"{func.__name__} assigns {sorted(set(names) & stores)}; it cannot be bound")
+        return {name: _lookup(func, name) for name in names}
+    chosen = {}
+    for name in sorted(loads - stores):
+        try:
+            value = _lookup(func, name)
+        except NameError:
+            continue   # not defined yet; leave it dynamic
+        if name not in func.__globals__ or isinstance(value, _CONSTANT_TYPES):
+            chosen[name] = value   # a builtin, or an immutable module constant
+    return chosen
+
+
+# Topic 2: mode="const" - LOAD_GLOBAL -> LOAD_CONST in the bytecode
+def _const_index(consts, value):
+    for index, existing in enumerate(consts):
+        if existing is value:
+            return index
+    consts.append(value)
+    return len(consts) - 1
+
+
+def _rewrite_code(code, values):
+    consts = [_rewrite_code(c, values) if hasattr(c, "co_code") else c for c in code.co_consts]
+    raw = bytearray(code.co_code)
+    units = 1 + _cache_units(_LOAD_GLOBAL)   # 2-byte code units taken by one LOAD_GLOBAL
+    for ins in dis.get_instructions(code):
+        if ins.opname != "LOAD_GLOBAL" or ins.argval not in values:
+            continue
+        push_null = _NULL_BIT and ins.arg & 1
+        index = _const_index(consts, values[ins.argval])
+        if index > 255:
+            continue   # would need an EXTENDED_ARG prefix and change the code size; keep the lookup
+        new = [(_LOAD_CONST, index)]
+        if push_null:
+            new = new + [(_PUSH_NULL, 0)] if _NULL_AFTER else [(_PUSH_NULL, 0)] + new
+        spare = units - len(new)
+        if spare >= 2:
+            new.append((_JUMP_FORWARD, spare - 1))   # skip the unused cache slots in one step
+            spare -= 1
+        new += [(_NOP, 0)] * spare
+        offset = ins.offset
+        if offset >= 2 and raw[offset - 2] == _EXTENDED_ARG:
+            raw[offset - 2:offset] = bytes((_NOP, 0))   # the old name index needed a prefix
+        raw[offset:offset + 2 * units] = bytes(b for pair in new for b in pair)
+    return code.replace(co_code=bytes(raw), co_consts=tuple(consts))
+
+
+# Topic 3: mode="local" - names become keyword-only parameters (fast locals)
+def _local_code(func, names):
+    if func.__code__.co_freevars:
+        raise TypeError(f"{func.__name__}: mode='local' does not support closures; use mode='const'")
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError) as exc:
+        raise TypeError(f"{func.__name__}: source code is not available; use mode='const'") from exc
+    module = ast.parse(source)
+    fdef = module.body[0]
+    fdef.decorator_list = []
+    taken = {a.arg for a in fdef.args.posonlyargs + fdef.args.args + fdef.args.kwonlyargs}
+    for name in names:
+        if name in taken:
+            raise ValueError(f"{func.__name__} already has a parameter called {name!r}")
+        fdef.args.kwonlyargs.append(ast.arg(arg=name))
+        fdef.args.kw_defaults.append(None)   # the real default is set through __kwdefaults__
+    ast.fix_missing_locations(module)
+    ast.increment_lineno(module, func.__code__.co_firstlineno - 1)
+    namespace = {}
+    exec(compile(module, inspect.getsourcefile(func) or "<bind_globals>", "exec"), func.__globals__, namespace)
+    return namespace[fdef.name].__code__
+
+
+# Topic 4: The decorator and the rebind API
+def bind_globals(func=None, *, names=None, mode="const"):
+    """Bind globals/builtins read by func as constants (mode='const') or fast locals (mode='local')."""
+    if func is None:
+        return lambda f: bind_globals(f, names=names, mode=mode)
+    if mode not in ("const", "local"):
+        raise ValueError("mode must be 'const' or 'local'")
+    original = _bound[func][0] if func in _bound else func.__code__
+    kwdefaults = _bound[func][1] if func in _bound else func.__kwdefaults__
+    values = _choose(func, original, names)
+    if mode == "const":
+        func.__code__ = _rewrite_code(original, values)
+    else:
+        func.__code__ = _local_code(func, values)
+        func.__kwdefaults__ = dict(kwdefaults or {}, **values)
+    _bound[func] = (original, kwdefaults, mode, values)
+    return func
+
+
+def stale(func):
+    """Return the names bound into func whose global now refers to a different object."""
+    values = _bound[func][3]
+    changed = []
+    for name, value in values.items():
+        try:
+            if _lookup(func, name) is not value:
+                changed.append(name)
+        except NameError:
+            changed.append(name)
+    return changed
+
+
+def rebind(func=None):
+    """Re-read the bound names of func (or of every bound function) from their globals."""
+    for target in ([func] if func is not None else list(_bound)):
+        original, kwdefaults, mode, values = _bound[target]
+        current = {name: _lookup(target, name) for name in values}
+        if mode == "const":
+            target.__code__ = _rewrite_code(original, current)
+        else:
+            target.__kwdefaults__ = dict(kwdefaults or {}, **current)   # no recompiling needed
+        _bound[target] = (original, kwdefaults, mode, current)
+
+
+def unbind(func):
+    original, kwdefaults, _, _ = _bound.pop(func)
+    func.__code__ = original
+    func.__kwdefaults__ = kwdefaults
+    return func
+
+
+def assign(namespace, name, value):
+    """namespace[name] = value, then rebind every function that bound name from that namespace."""
+    namespace[name] = value
+    for func, (_, _, _, values) in list(_bound.items()):
+        if name in values and func.__globals__ is namespace:
+            rebind(func)
+
+
+# Example code
+LIMIT = 3
+SCALE = 2
+
+
+def count_long(words):
+    total = 0
+    for word in words:
+        if len(word) > LIMIT:
+            total += SCALE
+    return total
+
+
+def count_long_by_hand(words, _len=len, _limit=LIMIT, _scale=SCALE):
+    # The classic manual version of the same trick
+    total = 0
+    for word in words:
+        if _len(word) > _limit:
+            total += _scale
+    return total
+
+
+def benchmark(n=10**6, repeat=5):
+    words = ["a", "abcd", "abcdef", "xy"] * (n // 4)
+    const_version = bind_globals(_copy(count_long))
+    local_version = bind_globals(_copy(count_long), mode="local")
+    print(f"Python {sys.version.split()[0]}, {len(words)} words, best of {repeat}")
+    for label, func in (("plain globals", count_long), ("default-argument trick", count_long_by_hand),
+                        ("bind_globals mode='const'", const_version),
+                        ("bind_globals mode='local'", local_version)):
+        best = min(_timed(func, words) for _ in range(repeat))
+        print(f"{label:<26} {best * 1e3:>8.1f} ms")
+
+
+def _copy(func):
+    # A separate function object sharing the same code and globals
+    clone = type(func)(func.__code__, func.__globals__, func.__name__, func.__defaults__, func.__closure__)
+    clone.__kwdefaults__ = func.__kwdefaults__
+    return clone
+
+
+def _timed(func, arg):
+    start = time.perf_counter()
+    func(arg)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Example 1: global_var and modify_global from PY_GlobalAndLocalVariables.py
+    global_var = "I am a global variable"
+
+    @bind_globals(names=["global_var"])
+    def show():
+        return global_var
+
+    def modify_global():
+        global global_var
+        global_var = "I have been modified"
+
+    print(show())                       # Output: I am a global variable
+    modify_global()
+    print(show(), stale(show))          # Output: I am a global variable ['global_var'] (old snapshot)
+    rebind(show)
+    print(show())                       # Output: I have been modified
+
+    # Example 2: assign() sets the global and rebinds in one step
+    assign(globals(), "global_var", "assigned")
+    print(show())                       # Output: assigned
+
+    # Example 3: what gets bound by default, and how the bytecode changes
+    words = ["a", "abcd", "abcdef"]
+    before = count_long(words)
+    bind_globals(count_long)
+    print(before, count_long(words), sorted(_bound[count_long][3]))  # Output: 4 4 ['LIMIT', 'SCALE', 'len']
+    print(sum(ins.opname == "LOAD_GLOBAL" for ins in dis.get_instructions(count_long)))  # Output: 0
+    assign(globals(), "LIMIT", 5)
+    print(count_long(words))            # Output: 2
+
+    # Example 4: mode='local' turns the names into keyword-only parameters
+    unbind(count_long)
+    bind_globals(count_long, mode="local")
+    print(inspect.signature(count_long))  # Output: (words, *, LIMIT=5, SCALE=2, len=<built-in function len>)
+    unbind(count_long)
+
+    if "--bench" in sys.argv:
+        benchmark()
+
+# Summary:
+# - Reading a global costs a lookup every time; a local or a constant does not.
+# - Binding takes a snapshot, so reassigning the global needs a rebind.
+# - Since Python 3.11 the interpreter caches global lookups, so measure before binding.
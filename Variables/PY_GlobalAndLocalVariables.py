@@ -132,3 +132,7 @@ def my_function():
     # - Mutability (list/dict/set vs int/str/tuple) determines whether in-place changes are
     #   visible through other references.
     # - Use `global` to rebind a module-level name from inside a function (rarely needed).
+    # - Reading a global in a hot loop costs a lookup each time; PY_BindGlobals.py binds such
+    #   names into a function as constants or fast locals (with rebind() for reassignments).
+    # - PY_IdentityTracer.py does these id() checks automatically for a whole workload: aliasing,
+    #   functions that mutate their arguments, and which scopes own the memory that stays alive.
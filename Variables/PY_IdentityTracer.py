@@ -0,0 +1,325 @@
+"""
+Tracing Object Identity, Aliasing and Memory
+
+PY_GlobalAndLocalVariables.py follows objects by hand with id():
+
+    rebind_number(num)   # x = x + 5 makes a *new* int; num is unchanged
+    mutate_list(lst)     # a_list.append(4) changes the *same* list lst refers to
+
+In a real program you want the same answers for thousands of calls:
+
+1. Which lines allocate the memory that is still alive at the end, and which
+   function (scope) owns those lines?
+2. When a function is called, how many names refer to the same mutable object
+   (the caller's `lst` and the callee's `a_list`)? Every such alias is a
+   choice between sharing (cheap, but changes are visible everywhere) and
+   copying (safe, but costs time and memory).
+3. Which functions mutate an argument they were given? That is the hidden
+   side of sharing: the caller's object changes.
+
+IdentityTracer answers these while a workload runs:
+
+    with IdentityTracer() as tracer:
+        workload()
+    print(tracer.format_report())
+
+- memory: tracemalloc records where every allocation happened; at the end we
+  take a snapshot of the allocations that are still alive ("retained") and
+  group them by source line. Each line is mapped to the function it belongs to.
+- aliasing and mutation: sys.setprofile calls the tracer on every Python
+  function call and return. On a call it compares the new frame's arguments
+  with the caller's local names (same id() == same object), and takes a
+  shallow fingerprint of every mutable argument (list, dict, set, bytearray,
+  objects with __dict__). On return the fingerprint is taken again; if it
+  differs, the function mutated that argument.
+
+The fingerprint is shallow: a_list.append(4) is seen, a_list[0].append(4) is
+not. Tracing slows the workload down a lot (tracemalloc and a Python call per
+function call), so use it to analyse, not in production.
+
+Only code in the included files is traced: by default everything outside the
+standard library and the tracer itself.
+"""
+
+import os
+import sys
+import sysconfig
+import threading
+import tracemalloc
+from collections import defaultdict
+
+
+_MUTABLE = (list, dict, set, bytearray)
+_SKIP_DIRS = tuple({os.path.normcase(os.path.abspath(sysconfig.get_paths()[key]))
+                    for key in ("stdlib", "platstdlib", "purelib", "platlib")})
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+
+
+def _fingerprint(obj):
+    """A cheap, shallow summary that changes when obj's contents change."""
+    if isinstance(obj, (list, bytearray)):
+        return (len(obj), tuple(map(id, obj)) if isinstance(obj, list) else bytes(obj))
+    if isinstance(obj, dict):
+        return (len(obj), tuple((id(k), id(v)) for k, v in obj.items()))
+    if isinstance(obj, set):
+        return (len(obj), frozenset(map(id, obj)))
+    state = getattr(obj, "__dict__", None)
+    if isinstance(state, dict):
+        return ("attrs", tuple((k, id(v)) for k, v in state.items()))
+    return None
+
+
+def _is_tracked(obj):
+    if isinstance(obj, _MUTABLE):
+        return True
+    return isinstance(getattr(obj, "__dict__", None), dict) and not isinstance(obj, type) \
+        and not callable(obj) and type(obj).__module__ != "builtins"
+
+
+class IdentityTracer:
+    def __init__(self, include=None, nframes=1):
+        """include: list of directories or files to trace (default: everything but the stdlib)."""
+        self.include = [os.path.normcase(os.path.abspath(p)) for p in include] if include else None
+        self.nframes = nframes
+        self.calls = defaultdict(int)                  # scope -> number of calls
+        self.aliases = {}                              # (scope, parameter) -> alias record
+        self.mutations = defaultdict(int)              # (scope, parameter) -> number of mutating calls
+        self._scopes = {}                              # filename -> [(first, last, scope)]
+        self._pending = {}                             # frame -> [(parameter, object, fingerprint)]
+        self._included = {}                            # filename -> bool (cache)
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    # -- attaching ------------------------------------------------------------------
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self._started_tracemalloc = True
+        tracemalloc.clear_traces()   # only count what the workload allocates from now on
+        threading.setprofile(self._profile)
+        sys.setprofile(self._profile)
+        return self
+
+    def stop(self):
+        sys.setprofile(None)
+        threading.setprofile(None)
+        self._snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self._pending.clear()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # -- the profile hook ----------------------------------------------------------------
+    def _wanted(self, filename):
+        wanted = self._included.get(filename)
+        if wanted is None:
+            path = os.path.normcase(os.path.abspath(filename))
+            if filename.startswith("<"):
+                wanted = False
+            elif self.include is not None:
+                wanted = any(path == p or path.startswith(p + os.sep) for p in self.include)
+            else:
+                wanted = not path.startswith(_SKIP_DIRS)
+            self._included[filename] = wanted
+        return wanted
+
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            if self._wanted(code.co_filename) and code not in _OWN_CODE:
+                self._on_call(frame, code)
+        elif event == "return":
+            pending = self._pending.pop(frame, None)
+            if pending:
+                self._on_return(frame, pending)
+
+    def _scope(self, code):
+        scope = getattr(code, "co_qualname", code.co_name)
+        # A comprehension is its own code object before Python 3.12; count it as its function.
+        for suffix in (".<locals>.<listcomp>", ".<locals>.<dictcomp>", ".<locals>.<setcomp>",
+                       ".<locals>.<genexpr>"):
+            if scope.endswith(suffix):
+                return scope[:-len(suffix)]
+        return scope
+
+    def _remember_scope(self, code):
+        lines = [line for _, _, line in code.co_lines() if line is not None]
+        if lines:
+            entry = (min(lines), max(lines), self._scope(code))
+            scopes = self._scopes.setdefault(code.co_filename, [])
+            if entry not in scopes:
+                scopes.append(entry)
+
+    def _on_call(self, frame, code):
+        scope = self._scope(code)
+        if scope not in self.calls:
+            self._remember_scope(code)
+        self.calls[scope] += 1
+        caller = frame.f_back
+        caller_names = defaultdict(list)
+        if caller is not None:
+            for name, value in caller.f_locals.items():
+                if _is_tracked(value):
+                    caller_names[id(value)].append(name)
+        caller_scope = self._scope(caller.f_code) if caller is not None else "?"
+        nargs = code.co_argcount + code.co_kwonlyargcount + bool(code.co_flags & 0x04) + bool(code.co_flags & 0x08)
+        pending = []
+        for parameter in code.co_varnames[:nargs]:
+            value = frame.f_locals.get(parameter)
+            if not _is_tracked(value):
+                continue
+            names = caller_names.get(id(value), [])
+            record = self.aliases.setdefault((scope, parameter), {
+                "scope": scope, "parameter": parameter, "type": type(value).__name__,
+                "calls": 0, "aliased_calls": 0, "max_names": 0, "caller_names": set()})
+            record["calls"] += 1
+            if names:
+                record["aliased_calls"] += 1
+                record["caller_names"].update(f"{caller_scope}.{name}" for name in names)
+            record["max_names"] = max(record["max_names"], 1 + len(names))
+            pending.append((parameter, value, _fingerprint(value)))
+        if pending:
+            self._pending[frame] = pending
+
+    def _on_return(self, frame, pending):
+        scope = self._scope(frame.f_code)
+        for parameter, value, before in pending:
+            if _fingerprint(value) != before:
+                self.mutations[(scope, parameter)] += 1
+
+    # -- reports ---------------------------------------------------------------------------
+    def _owner(self, filename, lineno):
+        best = None
+        for first, last, scope in self._scopes.get(filename, ()):
+            if first <= lineno <= last and (best is None or last - first < best[1] - best[0]):
+                best = (first, last, scope)   # the innermost function containing the line
+        return best[2] if best else "<module>"
+
+    def retained(self, sort="size", limit=20):
+        """Rows of memory still allocated at stop(), per source line, biggest first."""
+        if self._snapshot is None:
+            raise RuntimeError("call stop() (or leave the with block) first")
+        rows = []
+        for stat in self._snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            if not self._wanted(frame.filename) or _is_own_line(frame.filename, frame.lineno):
+                continue   # our own bookkeeping is not part of the workload
+            rows.append({"scope": self._owner(frame.filename, frame.lineno),
+                         "site": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                         "size": stat.size, "count": stat.count})
+        return _sorted(rows, sort)[:limit]
+
+    def retained_by_scope(self, sort="size", limit=20):
+        totals = {}
+        for row in self.retained(limit=None):
+            entry = totals.setdefault(row["scope"], {"scope": row["scope"], "size": 0, "count": 0, "sites": 0})
+            entry["size"] += row["size"]
+            entry["count"] += row["count"]
+            entry["sites"] += 1
+        return _sorted(list(totals.values()), sort)[:limit]
+
+    def alias_report(self, sort="aliased_calls"):
+        rows = [dict(record, caller_names=sorted(record["caller_names"])) for record in self.aliases.values()]
+        return _sorted(rows, sort)
+
+    def mutators(self):
+        """{scope: [parameters it mutated]} - functions that change objects they were given."""
+        result = defaultdict(list)
+        for (scope, parameter), count in sorted(self.mutations.items()):
+            result[scope].append(parameter)
+        return dict(result)
+
+    def format_report(self, sort="size", limit=10):
+        lines = [f"{'retained by scope':<30} {'KiB':>10} {'blocks':>8} {'sites':>6}"]
+        for row in self.retained_by_scope(sort, limit):
+            lines.append(f"{row['scope']:<30} {row['size'] / 1024:>10.1f} {row['count']:>8} {row['sites']:>6}")
+        lines += ["", f"{'biggest allocation sites':<30} {'KiB':>10} {'blocks':>8}  site"]
+        for row in self.retained(sort, limit):
+            lines.append(f"{row['scope']:<30} {row['size'] / 1024:>10.1f} {row['count']:>8}  {row['site']}")
+        lines += ["", f"{'aliased arguments':<30} {'type':<8} {'aliased/calls':>13}  caller names"]
+        for row in self.alias_report():
+            if row["aliased_calls"]:
+                name = f"{row['scope']}({row['parameter']})"
+                lines.append(f"{name:<30} {row['type']:<8} {row['aliased_calls']:>6}/{row['calls']:<6}  "
+                             f"{', '.join(row['caller_names'])}")
+        lines += ["", "functions that mutate their arguments:"]
+        for scope, parameters in self.mutators().items():
+            lines.append(f"  {scope}: {', '.join(parameters)} "
+                         f"({max(self.mutations[(scope, p)] for p in parameters)} calls)")
+        return "\n".join(lines)
+
+
+# The tracer's own functions are never traced or reported.
+_OWN_CODE = {f.__code__ for f in vars(IdentityTracer).values() if hasattr(f, "__code__")}
+_OWN_CODE |= {_fingerprint.__code__, _is_tracked.__code__}
+_OWN_LINES = {line for code in _OWN_CODE for _, _, line in code.co_lines() if line is not None}
+
+
+def _is_own_line(filename, lineno):
+    return lineno in _OWN_LINES and os.path.normcase(os.path.abspath(filename)) == _THIS_FILE
+
+
+def _sorted(rows, key):
+    if key is None:
+        return rows
+    reverse = key not in ("scope", "site", "parameter", "type")
+    return sorted(rows, key=lambda row: row[key], reverse=reverse)
+
+
+# Example workload: the demos from PY_GlobalAndLocalVariables.py at scale
+def rebind_number(x):
+    x = x + 5
+    return x
+
+
+def mutate_list(a_list):
+    a_list.append(4)
+
+
+def copy_then_extend(a_list):
+    result = list(a_list)   # copies, so the caller's list is safe
+    result.append(4)
+    return result
+
+
+cache = []
+
+
+def load_rows(n):
+    rows = [[i, i * 2, str(i)] for i in range(n)]
+    cache.append(rows)   # retained after the call: owned by load_rows
+    return len(rows)
+
+
+def workload():
+    num = 10
+    lst = [1, 2, 3]
+    for _ in range(100):
+        rebind_number(num)
+        mutate_list(lst)
+        copy_then_extend(lst)
+    load_rows(20_000)
+
+
+if __name__ == "__main__":
+    # Example 1: the by-hand demo, traced
+    with IdentityTracer() as tracer:
+        workload()
+    print(tracer.mutators())              # Output: {'mutate_list': ['a_list']}
+    print([(row["scope"], row["parameter"], row["caller_names"]) for row in tracer.alias_report()])
+    # Output: [('mutate_list', 'a_list', ['workload.lst']), ('copy_then_extend', 'a_list', ['workload.lst'])]
+    print(tracer.retained_by_scope(limit=1)[0]["scope"])   # Output: load_rows
+
+    # Example 2: the full report
+    print(tracer.format_report(limit=5))
+
+# Summary:
+# - id() tells whether two names refer to the same object; a tracer can check this on every call.
+# - Comparing a shallow fingerprint before and after a call reveals functions that mutate their inputs.
+# - tracemalloc snapshots show which lines, and so which scopes, own the memory that stays alive.